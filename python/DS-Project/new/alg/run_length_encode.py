@@ -0,0 +1,116 @@
+import numpy as np
+from core.sparse_formats import SparseFormat, bisect_segments
+
+def runs_from_coords(shape, rows, cols, data):
+    """
+    Groups row-major sorted pixels into runs: maximal horizontal stretches of
+    adjacent columns in one row holding the same value.
+
+    Returns:
+        tuple: (indptr over rows, run start columns, run lengths, run values).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    data = np.asarray(data)
+    if len(data):
+        breaks = np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1] + 1) | (data[1:] != data[:-1])]
+    else:
+        breaks = np.array([], dtype=bool)
+    starts = np.flatnonzero(breaks)
+    lengths = np.diff(np.r_[starts, len(data)])
+    # Explicitly stored zeros are background
+    keep = data[starts] != 0
+    starts, lengths = starts[keep], lengths[keep]
+    indptr = np.zeros(shape[0] + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.bincount(rows[starts], minlength=shape[0]))
+    return indptr, cols[starts].astype(np.int32), lengths.astype(np.int32), data[starts]
+
+def encode_rows(arr, background_val=0):
+    """
+    Row-wise run-length encoding of a dense 2D array, fully vectorized: run
+    boundaries are where the value changes or a new row begins. Runs of the
+    background value (and of 0) are dropped.
+
+    Returns:
+        tuple: (indptr over rows, run start columns, run lengths, run values).
+    """
+    h, w = arr.shape
+    flat = arr.ravel()
+    if not len(flat):
+        return np.zeros(h + 1, dtype=np.int32), np.array([], dtype=np.int32), np.array([], dtype=np.int32), flat
+    change = np.empty(len(flat), dtype=bool)
+    change[0] = True
+    np.not_equal(flat[1:], flat[:-1], out=change[1:])
+    change[::w] = True
+    starts = np.flatnonzero(change)
+    lengths = np.diff(np.r_[starts, len(flat)])
+    values = flat[starts]
+    keep = values != background_val
+    if background_val != 0:
+        # Zeros are never stored explicitly, same as the other formats
+        keep &= values != 0
+    starts, lengths, values = starts[keep], lengths[keep], values[keep]
+    rows, cols = np.divmod(starts, w)
+    indptr = np.zeros(h + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum(np.bincount(rows, minlength=h))
+    return indptr, cols.astype(np.int32), lengths.astype(np.int32), values
+
+class RLE(SparseFormat):
+    """
+    Row-wise Run-Length Encoded format.
+    Stores every horizontal run of one non-zero value as (start column, length,
+    value), indexed like CSR over rows. Thresholded and quantized images have
+    long runs, so this is much smaller than one index per pixel.
+    """
+    def __init__(self, shape, dtype=np.uint8):
+        super().__init__(shape, dtype)
+        # indptr (row pointers): row i is runs indptr[i]:indptr[i+1]
+        self.indptr = np.zeros(self.shape[0] + 1, dtype=np.int32)
+        # indices: start column of each run, sorted within a row
+        self.indices = np.array([], dtype=np.int32)
+        # lengths: number of pixels in each run
+        self.lengths = np.array([], dtype=np.int32)
+        # data: value of each run
+        self.data = np.array([], dtype=self.dtype)
+
+    def _run_rows(self):
+        return np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+
+    def expand(self):
+        """
+        Expands the runs into pixels.
+
+        Returns:
+            tuple: (rows, cols, data) of every stored pixel in row-major order.
+        """
+        lengths = self.lengths.astype(np.int64)
+        run_offsets = np.cumsum(lengths) - lengths
+        within = np.arange(int(lengths.sum())) - np.repeat(run_offsets, lengths)
+        rows = np.repeat(self._run_rows(), lengths)
+        cols = np.repeat(self.indices.astype(np.int64), lengths) + within
+        return rows, cols, np.repeat(self.data, lengths)
+
+    def get_pixel(self, row, col):
+        return self.get_pixels(row, col)[()]
+
+    def get_pixels(self, rows, cols):
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        out = np.zeros(rows.shape, dtype=self.dtype)
+        row_start = self.indptr[rows].astype(np.int64)
+        # The run that may contain col is the last one in the row starting at or before it
+        pos = bisect_segments(row_start, self.indptr[rows + 1], self.indices, cols + 1) - 1
+        if len(self.indices):
+            safe = np.clip(pos, 0, len(self.indices) - 1)
+            found = (pos >= row_start) & (cols < self.indices[safe].astype(np.int64) + self.lengths[safe])
+            out[found] = self.data[safe[found]]
+        return out
+
+    def set_pixel(self, row, col, value):
+        raise NotImplementedError("set_pixel is inefficient for RLE. Construct from another format.")
+
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
+        rows, cols, data = self.expand()
+        arr[rows, cols] = data
+        self.nnz = len(data)
+        return arr
@@ -9,7 +9,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from project_io import image_io, compressed_io
 from core import ds_utils
-from core.sparse_formats import DOK, COO, CSR
 
 def get_obj_size(obj):
     """Recursively finds size of objects in bytes for a rough estimate."""
@@ -21,6 +20,9 @@ def get_obj_size(obj):
         size += sum(map(get_obj_size, obj))
     elif isinstance(obj, np.ndarray):
         size += obj.nbytes
+    elif hasattr(obj, '__dict__'):
+        # Sparse format objects keep their storage in instance attributes
+        size += get_obj_size(vars(obj))
     return size
 
 def run_benchmark_for_image(image_path):
@@ -35,17 +37,24 @@ def run_benchmark_for_image(image_path):
         
     original_file_size = os.path.getsize(image_path)
     
-    for format_name in ['DOK', 'COO', 'CSR']:
+    for format_name in ['DOK', 'HashDOK', 'COO', 'CSR', 'CSC', 'BSR', 'RLE']:
         start_time = time.perf_counter()
         
         # --- Compression & Memory ---
-        dok = ds_utils.dense_to_dok(dense_array)
         if format_name == 'DOK':
-            sparse_obj = dok
+            sparse_obj = ds_utils.dense_to_dok(dense_array)
+        elif format_name == 'HashDOK':
+            sparse_obj = ds_utils.dense_to_hashdok(dense_array)
         elif format_name == 'COO':
-            sparse_obj = ds_utils.dok_to_coo(dok)
+            sparse_obj = ds_utils.dense_to_coo(dense_array)
         elif format_name == 'CSR':
-            sparse_obj = ds_utils.dok_to_csr(dok)
+            sparse_obj = ds_utils.dense_to_csr(dense_array)
+        elif format_name == 'CSC':
+            sparse_obj = ds_utils.dense_to_csc(dense_array)
+        elif format_name == 'BSR':
+            sparse_obj = ds_utils.dense_to_bsr(dense_array)
+        elif format_name == 'RLE':
+            sparse_obj = ds_utils.dense_to_rle(dense_array)
         
         compress_time = time.perf_counter() - start_time
         mem_usage = get_obj_size(sparse_obj)
@@ -57,7 +66,7 @@ def run_benchmark_for_image(image_path):
         
         # --- Decompression ---
         start_time = time.perf_counter()
-        loaded_obj = compressed_io.load_sparse(temp_path)
+        loaded_obj = compressed_io.load_sparse(temp_path)[0]
         loaded_obj.to_dense()
         decompress_time = time.perf_counter() - start_time
         
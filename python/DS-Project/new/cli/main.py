@@ -6,8 +6,8 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from project_io import image_io, compressed_io
+from project_io.codecs import CODECS
 from core import ds_utils
-from core.sparse_formats import DOK, COO, CSR
 
 def compress_image(args):
     """Handler for the 'compress' command."""
@@ -17,28 +17,28 @@ def compress_image(args):
     dense_array = image_io.load_image(args.input)
     print(f"Loaded image with shape: {dense_array.shape}")
 
-    # 2. Convert dense array to DOK (the easiest to build)
-    dok = ds_utils.dense_to_dok(dense_array)
-    print(f"Initial DOK representation created with {dok.nnz} non-zero elements.")
-
-    # 3. Convert to the target format
+    # 2. Convert the dense array straight to the target format
     target_format = args.format.upper()
     sparse_obj = None
     if target_format == 'DOK':
-        sparse_obj = dok
+        sparse_obj = ds_utils.dense_to_dok(dense_array)
     elif target_format == 'COO':
-        sparse_obj = ds_utils.dok_to_coo(dok)
+        sparse_obj = ds_utils.dense_to_coo(dense_array)
     elif target_format == 'CSR':
-        sparse_obj = ds_utils.dok_to_csr(dok)
+        sparse_obj = ds_utils.dense_to_csr(dense_array)
+    elif target_format == 'CSC':
+        sparse_obj = ds_utils.dense_to_csc(dense_array)
+    elif target_format == 'RLE':
+        sparse_obj = ds_utils.dense_to_rle(dense_array)
     else:
         print(f"Error: Unknown format '{args.format}'", file=sys.stderr)
         return
 
-    print(f"Converted to {target_format} format.")
+    print(f"Converted to {target_format} format with {sparse_obj.nnz} non-zero elements.")
 
-    # 4. Save the sparse object
-    compressed_io.save_sparse(args.output, sparse_obj)
-    print("Compression successful.")
+    # 3. Save the sparse object
+    compressed_io.save_sparse(args.output, sparse_obj, codec=args.codec, level=args.level)
+    print(f"Compression successful (codec: {args.codec}).")
     
     original_size = os.path.getsize(args.input)
     compressed_size = os.path.getsize(args.output)
@@ -52,12 +52,12 @@ def decompress_image(args):
     """Handler for the 'decompress' command."""
     print(f"Decompressing '{args.input}' to '{args.output}'.")
 
-    # 1. Load the sparse object
-    sparse_obj = compressed_io.load_sparse(args.input)
-    print(f"Loaded sparse object in {sparse_obj.__class__.__name__} format.")
+    # 1. Load the sparse channels
+    sparse_objs = compressed_io.load_sparse(args.input)
+    print(f"Loaded {len(sparse_objs)} channel(s) in {sparse_objs[0].__class__.__name__} format.")
 
     # 2. Convert to dense array
-    dense_array = sparse_obj.to_dense()
+    dense_array = ds_utils.channels_to_dense(sparse_objs)
     print("Converted to dense array.")
 
     # 3. Save the array as an image
@@ -73,7 +73,9 @@ def main():
     parser_compress = subparsers.add_parser('compress', help='Compress an image file.')
     parser_compress.add_argument('-i', '--input', type=str, required=True, help='Input image file path.')
     parser_compress.add_argument('-o', '--output', type=str, required=True, help='Output compressed file path (.npz).')
-    parser_compress.add_argument('-f', '--format', type=str, default='CSR', choices=['dok', 'coo', 'csr'], help='Sparse format to use.')
+    parser_compress.add_argument('-f', '--format', type=str, default='CSR', choices=['dok', 'coo', 'csr', 'csc', 'rle'], help='Sparse format to use.')
+    parser_compress.add_argument('-c', '--codec', type=str, default='zlib', choices=list(CODECS) + ['auto'], help="Codec for the stored arrays; 'auto' picks one per array.")
+    parser_compress.add_argument('-l', '--level', type=int, default=None, help='Codec compression level (default: codec default).')
     parser_compress.set_defaults(func=compress_image)
 
     # --- Decompress command ---
@@ -0,0 +1,162 @@
+import numpy as np
+from .sparse_formats import COO, CSR
+from .ds_utils import convert, convert_like, _csr_from_sorted, _csr_rows
+
+# name -> (numpy ufunc, whether only the intersection of the operands can be non-zero)
+ELEMENTWISE_OPS = {
+    'add': (np.add, False),
+    'subtract': (np.subtract, False),
+    'multiply': (np.multiply, True),
+    'bitwise_and': (np.bitwise_and, True),
+    'bitwise_or': (np.bitwise_or, False),
+    'maximum': (np.maximum, False),
+    'minimum': (np.minimum, False),
+}
+
+def linear_entries(sparse_obj):
+    """
+    Returns the stored elements of a sparse object as sorted, unique row-major
+    linear indices (row * shape[1] + col) and their values.
+    Duplicate COO coordinates keep the last value, like to_dense.
+    """
+    if isinstance(sparse_obj, CSR):
+        return _csr_rows(sparse_obj) * sparse_obj.shape[1] + sparse_obj.indices, sparse_obj.data
+    coo = convert(sparse_obj, COO)
+    keys = coo.linear_index()
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], np.asarray(coo.data)[order]
+    last = np.ones(len(keys), dtype=bool)
+    last[:-1] = keys[1:] != keys[:-1]
+    return keys[last], values[last]
+
+def nonzero_entries(sparse_obj):
+    """linear_entries without explicitly stored zeros."""
+    keys, values = linear_entries(sparse_obj)
+    nonzero = values != 0
+    return keys[nonzero], values[nonzero]
+
+def from_linear_entries(like, shape, dtype, keys, values):
+    """Builds a sparse object in the format of `like` (CSR or COO) from sorted linear indices and values."""
+    rows, cols = np.divmod(keys, shape[1])
+    if isinstance(like, COO) or like is COO:
+        return COO.from_arrays(rows, cols, values, shape, dtype=dtype)
+    return _csr_from_sorted(shape, dtype, rows, cols, values)
+
+def like_from_entries(like, keys, values, dtype=None):
+    """
+    Builds a sparse object of `like`'s shape and format (any format, keeping
+    options such as the BSR block size) from sorted linear indices and values.
+    The dtype defaults to `like`'s.
+    """
+    dtype = like.dtype if dtype is None else dtype
+    if isinstance(like, (COO, CSR)):
+        return from_linear_entries(like, like.shape, dtype, keys, values)
+    return convert_like(from_linear_entries(COO, like.shape, dtype, keys, values), like)
+
+def align(keys_a, values_a, keys_b, values_b):
+    """
+    Merges two sorted, unique key sets onto their union.
+
+    Returns:
+        tuple: (union keys, values of a on the union, values of b on the union), zero-filled where missing.
+    """
+    keys = np.union1d(keys_a, keys_b)
+    full_a = np.zeros(len(keys), dtype=values_a.dtype)
+    full_b = np.zeros(len(keys), dtype=values_b.dtype)
+    full_a[np.searchsorted(keys, keys_a)] = values_a
+    full_b[np.searchsorted(keys, keys_b)] = values_b
+    return keys, full_a, full_b
+
+def saturating(func, x, y, dtype):
+    """
+    Applies `func` in a wide type and clips integer results to the range of `dtype` (e.g. 0..255 for uint8).
+    Integer operands are computed in int64; if either side is a float the work is done
+    in float64 and the result is rounded before clipping, so csr_uint8 * 0.5 halves values.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        is_float = np.result_type(np.asarray(x).dtype, np.asarray(y).dtype, np.int64).kind == 'f'
+        wide = np.dtype(np.float64 if is_float else np.int64)
+        result = func(np.asarray(x, dtype=wide), np.asarray(y, dtype=wide))
+        if is_float:
+            result = np.rint(result)
+        return np.clip(result, info.min, info.max).astype(dtype)
+    return np.asarray(func(x, y)).astype(dtype)
+
+def elementwise(a, b, op):
+    """
+    Applies an element-wise operation between a sparse object and another
+    sparse object of the same shape, or a scalar, without densifying.
+
+    The result has the format and dtype of `a`; integer results saturate
+    instead of wrapping. Cost is proportional to the operands' nnz.
+
+    Args:
+        a: CSR or COO left operand.
+        b: Sparse object of the same shape, or a scalar.
+        op (str): One of ELEMENTWISE_OPS.
+
+    Returns:
+        A new sparse object with explicit zeros removed.
+    """
+    if op not in ELEMENTWISE_OPS:
+        raise ValueError(f"Unknown element-wise operation '{op}'.")
+    func, intersection_only = ELEMENTWISE_OPS[op]
+    keys_a, values_a = linear_entries(a)
+    if np.isscalar(b):
+        if saturating(func, 0, b, a.dtype) != 0:
+            raise ValueError(f"{op} with {b} turns background pixels non-zero and would produce a dense result.")
+        keys, values = keys_a, saturating(func, values_a, b, a.dtype)
+    else:
+        if a.shape != b.shape:
+            raise ValueError(f"Shape mismatch: {a.shape} vs {b.shape}.")
+        keys_b, values_b = linear_entries(b)
+        if intersection_only:
+            keys, idx_a, idx_b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+            values = saturating(func, values_a[idx_a], values_b[idx_b], a.dtype)
+        else:
+            keys, full_a, full_b = align(keys_a, values_a, keys_b, values_b)
+            values = saturating(func, full_a, full_b, a.dtype)
+    nonzero = values != 0
+    return from_linear_entries(a, a.shape, a.dtype, keys[nonzero], values[nonzero])
+
+def reflected(a, b, op):
+    """Applies `op` with the operands swapped (b op a), for expressions like `3 - csr`."""
+    if not np.isscalar(b):
+        return elementwise(b, a, op)
+    func = ELEMENTWISE_OPS[op][0]
+    if saturating(func, b, 0, a.dtype) != 0:
+        raise ValueError(f"{op} with {b} turns background pixels non-zero and would produce a dense result.")
+    keys, values = linear_entries(a)
+    values = saturating(func, b, values, a.dtype)
+    nonzero = values != 0
+    return from_linear_entries(a, a.shape, a.dtype, keys[nonzero], values[nonzero])
+
+def add(a, b):
+    """Element-wise a + b, saturating for integer dtypes."""
+    return elementwise(a, b, 'add')
+
+def subtract(a, b):
+    """Element-wise a - b, saturating for integer dtypes."""
+    return elementwise(a, b, 'subtract')
+
+def multiply(a, b):
+    """Element-wise a * b, saturating for integer dtypes."""
+    return elementwise(a, b, 'multiply')
+
+def bitwise_and(a, b):
+    """Element-wise a & b."""
+    return elementwise(a, b, 'bitwise_and')
+
+def bitwise_or(a, b):
+    """Element-wise a | b."""
+    return elementwise(a, b, 'bitwise_or')
+
+def maximum(a, b):
+    """Element-wise max(a, b), saturating for integer dtypes."""
+    return elementwise(a, b, 'maximum')
+
+def minimum(a, b):
+    """Element-wise min(a, b), saturating for integer dtypes."""
+    return elementwise(a, b, 'minimum')
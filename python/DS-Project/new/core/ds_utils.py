@@ -1,71 +1,313 @@
+import heapq
 import numpy as np
-from .sparse_formats import DOK, COO, CSR
+from .sparse_formats import SparseFormat, DOK, HashDOK, COO, CSR, CSC, BSR
+from alg.run_length_encode import RLE, encode_rows, runs_from_coords
+
+def _dense_nonzero(arr, background_val=0):
+    """Returns the row, col and data arrays of pixels that differ from the background, in row-major order."""
+    mask = arr != background_val
+    if background_val != 0:
+        # Zeros are never stored explicitly, same as DOK.set_pixel
+        mask &= arr != 0
+    rows, cols = np.nonzero(mask)
+    return rows, cols, arr[mask]
+
+def _dok_from_arrays(shape, dtype, rows, cols, data):
+    """Builds a DOK from parallel coordinate/value arrays in one dict construction."""
+    dok = DOK(shape, dtype=dtype)
+    nonzero = np.asarray(data) != 0
+    rows, cols, data = np.asarray(rows)[nonzero], np.asarray(cols)[nonzero], np.asarray(data)[nonzero]
+    dok.pixels = dict(zip(zip(rows.tolist(), cols.tolist()), data.tolist()))
+    dok.nnz = len(dok.pixels)
+    return dok
+
+def _dok_arrays(dok: DOK):
+    """Returns the (row, col, data) arrays of a DOK in dict order."""
+    n = len(dok.pixels)
+    keys = np.fromiter((k for key in dok.pixels for k in key), dtype=np.int64, count=2 * n).reshape(n, 2)
+    data = np.fromiter(dok.pixels.values(), dtype=dok.dtype, count=n)
+    return keys[:, 0], keys[:, 1], data
+
+def _csr_from_sorted(shape, dtype, rows, cols, data):
+    """Builds a CSR from coordinate arrays that are already in row-major order."""
+    csr = CSR(shape, dtype=dtype)
+    csr.indptr[1:] = np.cumsum(np.bincount(rows, minlength=shape[0]))
+    csr.indices = np.asarray(cols, dtype=np.int32)
+    csr.data = np.asarray(data, dtype=dtype)
+    csr.nnz = len(csr.data)
+    return csr
+
+def _csc_from_sorted(shape, dtype, rows, cols, data):
+    """Builds a CSC from coordinate arrays that are already in column-major order."""
+    csc = CSC(shape, dtype=dtype)
+    csc.indptr[1:] = np.cumsum(np.bincount(cols, minlength=shape[1]))
+    csc.indices = np.asarray(rows, dtype=np.int32)
+    csc.data = np.asarray(data, dtype=dtype)
+    csc.nnz = len(csc.data)
+    return csc
+
+def _col_major_order(shape, rows, cols):
+    """Returns the stable permutation that sorts coordinates by column, then row."""
+    keys = np.asarray(cols, dtype=np.int64) * shape[0] + np.asarray(rows, dtype=np.int64)
+    return np.argsort(keys, kind='stable')
+
+def _row_major_order(shape, rows, cols):
+    """Returns the stable permutation that sorts coordinates by row, then column."""
+    keys = np.asarray(rows, dtype=np.int64) * shape[1] + np.asarray(cols, dtype=np.int64)
+    return np.argsort(keys, kind='stable')
+
+def _csr_rows(csr: CSR):
+    """Expands indptr into one row id per stored element."""
+    return np.repeat(np.arange(csr.shape[0], dtype=np.int64), np.diff(csr.indptr))
+
+def _csc_cols(csc: CSC):
+    """Expands indptr into one column id per stored element."""
+    return np.repeat(np.arange(csc.shape[1]), np.diff(csc.indptr))
 
 def dense_to_dok(arr, background_val=0):
     """Converts a dense numpy array to a DOK sparse matrix."""
-    shape = arr.shape
-    dok = DOK(shape, dtype=arr.dtype)
-    for r in range(shape[0]):
-        for c in range(shape[1]):
-            val = arr[r, c]
-            if val != background_val:
-                dok.set_pixel(r, c, val)
-    return dok
+    rows, cols, data = _dense_nonzero(arr, background_val)
+    return _dok_from_arrays(arr.shape, arr.dtype, rows, cols, data)
+
+def dense_to_hashdok(arr, background_val=0):
+    """Converts a dense numpy array to a HashDOK sparse matrix."""
+    rows, cols, data = _dense_nonzero(arr, background_val)
+    hashdok = HashDOK(arr.shape, dtype=arr.dtype, capacity=int(len(data) / HashDOK._MAX_LOAD) + 1)
+    hashdok.set_pixels(rows, cols, data)
+    return hashdok
+
+def dense_to_coo(arr, background_val=0):
+    """Converts a dense numpy array to a COO sparse matrix without going through DOK."""
+    rows, cols, data = _dense_nonzero(arr, background_val)
+    return COO.from_arrays(rows, cols, data, arr.shape, dtype=arr.dtype)
+
+def dense_to_csr(arr, background_val=0):
+    """Converts a dense numpy array to a CSR sparse matrix without going through DOK."""
+    # np.nonzero returns row-major order, so the column indices are already sorted per row
+    rows, cols, data = _dense_nonzero(arr, background_val)
+    return _csr_from_sorted(arr.shape, arr.dtype, rows, cols, data)
+
+def dense_to_csc(arr, background_val=0):
+    """Converts a dense numpy array to a CSC sparse matrix without going through DOK."""
+    # Scanning the transpose yields column-major order directly
+    cols, rows, data = _dense_nonzero(arr.T, background_val)
+    return _csc_from_sorted(arr.shape, arr.dtype, rows, cols, data)
+
+def dense_to_bsr(arr, block_size=16, background_val=0):
+    """Converts a dense numpy array to a BSR sparse matrix, keeping only tiles that contain data."""
+    bsr = BSR(arr.shape, dtype=arr.dtype, block_size=block_size)
+    rows, cols, data = _dense_nonzero(arr, background_val)
+    padded = np.zeros((bsr.block_shape[0] * block_size, bsr.block_shape[1] * block_size), dtype=arr.dtype)
+    padded[rows, cols] = data
+    tiles = padded.reshape(bsr.block_shape[0], block_size, bsr.block_shape[1], block_size).transpose(0, 2, 1, 3)
+    occupied = tiles.any(axis=(2, 3))
+    block_rows, block_cols = np.nonzero(occupied)
+    bsr.indptr[1:] = np.cumsum(np.bincount(block_rows, minlength=bsr.block_shape[0]))
+    bsr.indices = block_cols.astype(np.int32)
+    bsr.blocks = tiles[occupied]
+    bsr.nnz = len(data)
+    return bsr
+
+def _rle_from_runs(shape, dtype, runs):
+    rle = RLE(shape, dtype=dtype)
+    rle.indptr, rle.indices, rle.lengths, data = runs
+    rle.data = np.asarray(data, dtype=dtype)
+    rle.nnz = int(rle.lengths.sum(dtype=np.int64))
+    return rle
+
+def dense_to_rle(arr, background_val=0):
+    """Converts a dense numpy array to a row-wise RLE, finding run boundaries with one vectorized pass."""
+    return _rle_from_runs(arr.shape, arr.dtype, encode_rows(arr, background_val))
 
 def dok_to_coo(dok: DOK):
     """Converts a DOK sparse matrix to a COO sparse matrix."""
-    coo = COO(dok.shape, dtype=dok.dtype)
-    if not dok.pixels:
-        return coo
-
+    rows, cols, data = _dok_arrays(dok)
     # Sort pixels by row, then column for predictable order
-    sorted_pixels = sorted(dok.pixels.items())
-    
-    rows, cols, datas = zip(*[(r, c, v) for (r, c), v in sorted_pixels])
+    order = _row_major_order(dok.shape, rows, cols)
+    return COO.from_arrays(rows[order], cols[order], data[order], dok.shape, dtype=dok.dtype)
+
+def coo_to_dok(coo: COO):
+    """Converts a COO sparse matrix to a DOK sparse matrix."""
+    return _dok_from_arrays(coo.shape, coo.dtype, coo.row, coo.col, coo.data)
+
+def hashdok_to_coo(hashdok: HashDOK):
+    """Converts a HashDOK sparse matrix to a COO sparse matrix (in row-major order)."""
+    rows, cols, data = hashdok.to_arrays()
+    return COO.from_arrays(rows, cols, data, hashdok.shape, dtype=hashdok.dtype)
 
-    coo.row = list(rows)
-    coo.col = list(cols)
-    coo.data = list(datas)
-    coo.nnz = len(coo.data)
-    return coo
+def coo_to_hashdok(coo: COO):
+    """Converts a COO sparse matrix to a HashDOK sparse matrix."""
+    hashdok = HashDOK(coo.shape, dtype=coo.dtype, capacity=int(len(coo.data) / HashDOK._MAX_LOAD) + 1)
+    hashdok.set_pixels(coo.row, coo.col, coo.data)
+    return hashdok
 
 def coo_to_csr(coo: COO):
     """Converts a COO sparse matrix to a CSR sparse matrix."""
-    csr = CSR(coo.shape, dtype=coo.dtype)
-    if coo.nnz == 0:
-        return csr
-
-    # Combine row, col, data for sorting
-    combined = sorted(zip(coo.row, coo.col, coo.data))
-    sorted_row, sorted_col, sorted_data = zip(*combined)
-
-    csr.indices = np.array(sorted_col, dtype=np.int32)
-    csr.data = np.array(sorted_data, dtype=coo.dtype)
-    csr.nnz = coo.nnz
-
-    # Build the indptr array
-    row_idx = 0
-    for i, r in enumerate(sorted_row):
-        while row_idx < r:
-            csr.indptr[row_idx + 1] = i
-            row_idx += 1
-    
-    # Fill in the rest of the indptr array
-    for i in range(row_idx, csr.shape[0]):
-         csr.indptr[i+1] = csr.nnz
-            
-    return csr
+    order = _row_major_order(coo.shape, coo.row, coo.col)
+    rows = np.asarray(coo.row, dtype=np.int64)[order]
+    cols = np.asarray(coo.col)[order]
+    return _csr_from_sorted(coo.shape, coo.dtype, rows, cols, np.asarray(coo.data)[order])
+
+def csr_to_coo(csr: CSR):
+    """Converts a CSR sparse matrix to a COO sparse matrix."""
+    return COO.from_arrays(_csr_rows(csr), csr.indices, csr.data, csr.shape, dtype=csr.dtype)
 
 def dok_to_csr(dok: DOK):
-    """Convenience function to convert DOK -> COO -> CSR."""
-    coo = dok_to_coo(dok)
-    return coo_to_csr(coo)
+    """Converts a DOK sparse matrix to a CSR sparse matrix."""
+    rows, cols, data = _dok_arrays(dok)
+    order = _row_major_order(dok.shape, rows, cols)
+    return _csr_from_sorted(dok.shape, dok.dtype, rows[order], cols[order], data[order])
 
-# You can also add reverse conversions if needed, e.g., csr_to_dok
 def csr_to_dok(csr: CSR):
     """Converts a CSR sparse matrix to a DOK sparse matrix."""
-    dok = DOK(csr.shape, dtype=csr.dtype)
-    for r in range(csr.shape[0]):
-        for i in range(csr.indptr[r], csr.indptr[r+1]):
-            dok.set_pixel(r, csr.indices[i], csr.data[i])
-    return dok
+    return _dok_from_arrays(csr.shape, csr.dtype, _csr_rows(csr), csr.indices, csr.data)
+
+def csr_to_csc(csr: CSR):
+    """Converts a CSR sparse matrix to a CSC sparse matrix."""
+    rows = _csr_rows(csr)
+    # CSR is row-major, so a stable sort on the column alone gives column-major order
+    order = np.argsort(csr.indices, kind='stable')
+    return _csc_from_sorted(csr.shape, csr.dtype, rows[order], csr.indices[order], csr.data[order])
+
+def csc_to_csr(csc: CSC):
+    """Converts a CSC sparse matrix to a CSR sparse matrix."""
+    cols = _csc_cols(csc)
+    order = np.argsort(csc.indices, kind='stable')
+    return _csr_from_sorted(csc.shape, csc.dtype, csc.indices[order], cols[order], csc.data[order])
+
+def coo_to_csc(coo: COO):
+    """Converts a COO sparse matrix to a CSC sparse matrix."""
+    order = _col_major_order(coo.shape, coo.row, coo.col)
+    cols = np.asarray(coo.col, dtype=np.int64)[order]
+    rows = np.asarray(coo.row)[order]
+    return _csc_from_sorted(coo.shape, coo.dtype, rows, cols, np.asarray(coo.data)[order])
+
+def csc_to_coo(csc: CSC):
+    """Converts a CSC sparse matrix to a COO sparse matrix (in column-major order)."""
+    return COO.from_arrays(csc.indices, _csc_cols(csc), csc.data, csc.shape, dtype=csc.dtype)
+
+def coo_to_bsr(coo: COO, block_size=16):
+    """Converts a COO sparse matrix to a BSR sparse matrix with `block_size` x `block_size` tiles."""
+    bsr = BSR(coo.shape, dtype=coo.dtype, block_size=block_size)
+    rows = np.asarray(coo.row, dtype=np.int64)
+    cols = np.asarray(coo.col, dtype=np.int64)
+    tile_keys = (rows // block_size) * bsr.block_shape[1] + cols // block_size
+    unique_keys, tile_of = np.unique(tile_keys, return_inverse=True)
+    block_rows, block_cols = np.divmod(unique_keys, bsr.block_shape[1])
+    bsr.indptr[1:] = np.cumsum(np.bincount(block_rows, minlength=bsr.block_shape[0]))
+    bsr.indices = block_cols.astype(np.int32)
+    bsr.blocks = np.zeros((len(unique_keys), block_size, block_size), dtype=coo.dtype)
+    bsr.blocks[tile_of, rows % block_size, cols % block_size] = coo.data
+    bsr.nnz = int(np.count_nonzero(bsr.blocks))
+    return bsr
+
+def bsr_to_coo(bsr: BSR):
+    """Converts a BSR sparse matrix to a COO sparse matrix (in tile order)."""
+    bs = bsr.block_size
+    block_rows = np.repeat(np.arange(bsr.block_shape[0]), np.diff(bsr.indptr))
+    tile, i, j = np.nonzero(bsr.blocks)
+    rows = block_rows[tile] * bs + i
+    cols = bsr.indices[tile].astype(np.int64) * bs + j
+    return COO.from_arrays(rows, cols, bsr.blocks[tile, i, j], bsr.shape, dtype=bsr.dtype)
+
+def csr_to_rle(csr: CSR):
+    """Converts a CSR sparse matrix to an RLE by grouping equal adjacent values in each row."""
+    return _rle_from_runs(csr.shape, csr.dtype, runs_from_coords(csr.shape, _csr_rows(csr), csr.indices, csr.data))
+
+def rle_to_csr(rle: RLE):
+    """Converts an RLE sparse matrix to a CSR sparse matrix by expanding the runs."""
+    rows, cols, data = rle.expand()
+    return _csr_from_sorted(rle.shape, rle.dtype, rows, cols, data)
+
+# --- Conversion graph ---
+# (source, target) -> (converter, cost). Costs are rough relative weights:
+# 1 for O(nnz) array passes, 2 for edges that sort, 3 for edges that touch Python dicts.
+CONVERTERS = {
+    ('DOK', 'COO'): (dok_to_coo, 3),
+    ('DOK', 'CSR'): (dok_to_csr, 3),
+    ('COO', 'DOK'): (coo_to_dok, 3),
+    ('COO', 'CSR'): (coo_to_csr, 2),
+    ('CSR', 'COO'): (csr_to_coo, 1),
+    ('CSR', 'DOK'): (csr_to_dok, 3),
+    ('CSR', 'CSC'): (csr_to_csc, 2),
+    ('CSC', 'CSR'): (csc_to_csr, 2),
+    ('COO', 'CSC'): (coo_to_csc, 2),
+    ('CSC', 'COO'): (csc_to_coo, 1),
+    ('COO', 'BSR'): (coo_to_bsr, 2),
+    ('BSR', 'COO'): (bsr_to_coo, 1),
+    ('HashDOK', 'COO'): (hashdok_to_coo, 2),
+    ('COO', 'HashDOK'): (coo_to_hashdok, 2),
+    ('CSR', 'RLE'): (csr_to_rle, 1),
+    ('RLE', 'CSR'): (rle_to_csr, 1),
+}
+
+def _format_name(target):
+    """Normalizes a format given as a class or a case-insensitive name ('csr', 'hashdok') to its class name."""
+    if isinstance(target, type) and issubclass(target, SparseFormat):
+        return target.__name__
+    names = {name.upper(): name for edge in CONVERTERS for name in edge}
+    return names.get(str(target).upper(), str(target))
+
+def conversion_path(source, target):
+    """
+    Finds the cheapest chain of converters from one format to another.
+
+    Args:
+        source, target: Format classes or names.
+
+    Returns:
+        list: The converter functions to apply in order (empty if the formats match).
+    """
+    source, target = _format_name(source), _format_name(target)
+    # Dijkstra over the (tiny) conversion graph
+    queue = [(0, source, [])]
+    visited = set()
+    while queue:
+        cost, fmt, path = heapq.heappop(queue)
+        if fmt == target:
+            return [CONVERTERS[edge][0] for edge in path]
+        if fmt in visited:
+            continue
+        visited.add(fmt)
+        for (src, dst), (_, edge_cost) in CONVERTERS.items():
+            if src == fmt and dst not in visited:
+                heapq.heappush(queue, (cost + edge_cost, dst, path + [(src, dst)]))
+    raise ValueError(f"No conversion from {source} to {target}.")
+
+def convert(sparse_obj, target, **options):
+    """
+    Converts a sparse object to another format along the cheapest route.
+
+    Args:
+        sparse_obj: The sparse object to convert.
+        target: The target format, as a class (CSR) or a name ('csr').
+        **options: Passed to the final converter, e.g. block_size for BSR.
+
+    Returns:
+        The converted object, or `sparse_obj` itself if it is already in the target format.
+    """
+    path = conversion_path(sparse_obj.__class__, target)
+    for i, func in enumerate(path):
+        sparse_obj = func(sparse_obj, **options) if i == len(path) - 1 else func(sparse_obj)
+    return sparse_obj
+
+def convert_like(sparse_obj, like):
+    """Converts `sparse_obj` to the format of `like`, keeping format options such as the BSR block size."""
+    options = {'block_size': like.block_size} if isinstance(like, BSR) else {}
+    return convert(sparse_obj, like.__class__, **options)
+
+def channels_to_dense(sparse_objs):
+    """
+    Reconstructs a list of sparse channels into one dense image.
+    Each channel is written straight into its slice of a single preallocated array.
+
+    Returns:
+        np.ndarray: (H, W) for a single channel, (H, W, C) otherwise.
+    """
+    if len(sparse_objs) == 1:
+        return sparse_objs[0].to_dense()
+    first = sparse_objs[0]
+    arr = np.empty(first.shape + (len(sparse_objs),), dtype=first.dtype)
+    for i, sparse_obj in enumerate(sparse_objs):
+        sparse_obj.to_dense(out=arr[..., i])
+    return arr
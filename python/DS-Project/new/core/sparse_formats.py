@@ -22,15 +22,131 @@ class SparseFormat(ABC):
         pass
 
     @abstractmethod
-    def to_dense(self):
-        """Converts the sparse representation back to a dense 2D numpy array."""
+    def to_dense(self, out=None):
+        """
+        Converts the sparse representation back to a dense 2D numpy array.
+        If `out` is given it is zeroed, filled and returned instead of allocating a new array.
+        """
         pass
 
+    def _dense_buffer(self, out=None):
+        """Returns a zeroed dense array for to_dense, reusing `out` when it is provided."""
+        if out is None:
+            return np.zeros(self.shape, dtype=self.dtype)
+        if out.shape != self.shape:
+            raise ValueError(f"Output buffer has shape {out.shape}, expected {self.shape}.")
+        out[...] = 0
+        return out
+
+    def get_pixels(self, rows, cols):
+        """
+        Looks up a batch of pixels at once.
+
+        Args:
+            rows, cols (array-like): Coordinates of the pixels to read.
+
+        Returns:
+            np.ndarray: The pixel values, 0 where nothing is stored.
+        """
+        rows, cols = np.broadcast_arrays(np.asarray(rows), np.asarray(cols))
+        values = [self.get_pixel(r, c) for r, c in zip(rows.ravel().tolist(), cols.ravel().tolist())]
+        return np.array(values, dtype=self.dtype).reshape(rows.shape)
+
     def __repr__(self):
         return (f"{self.__class__.__name__}(shape={self.shape}, "
                 f"nnz={self.nnz}, dtype={np.dtype(self.dtype).name})")
 
 
+class ElementwiseMixin:
+    """
+    Element-wise operators for sparse formats, implemented as sorted
+    linear-index merges in core.algebra. Results keep the format and dtype of
+    the left operand, and integer results saturate instead of wrapping.
+    """
+    # Keep NumPy from broadcasting over us when a NumPy scalar is on the left
+    __array_ufunc__ = None
+
+    def _elementwise(self, other, op):
+        from . import algebra
+        return algebra.elementwise(self, other, op)
+
+    def _reflected(self, other, op):
+        from . import algebra
+        return algebra.reflected(self, other, op)
+
+    def __add__(self, other):
+        return self._elementwise(other, 'add')
+
+    def __radd__(self, other):
+        return self._reflected(other, 'add')
+
+    def __sub__(self, other):
+        return self._elementwise(other, 'subtract')
+
+    def __rsub__(self, other):
+        return self._reflected(other, 'subtract')
+
+    def __mul__(self, other):
+        return self._elementwise(other, 'multiply')
+
+    def __rmul__(self, other):
+        return self._reflected(other, 'multiply')
+
+    def __and__(self, other):
+        return self._elementwise(other, 'bitwise_and')
+
+    def __rand__(self, other):
+        return self._reflected(other, 'bitwise_and')
+
+    def __or__(self, other):
+        return self._elementwise(other, 'bitwise_or')
+
+    def __ror__(self, other):
+        return self._reflected(other, 'bitwise_or')
+
+    def maximum(self, other):
+        return self._elementwise(other, 'maximum')
+
+    def minimum(self, other):
+        return self._elementwise(other, 'minimum')
+
+
+def bisect_segments(starts, ends, indices, keys):
+    """
+    Vectorized bisect_left: for every i, the first position in the sorted run
+    indices[starts[i]:ends[i]] whose value is >= keys[i] (ends[i] if there is none).
+    """
+    lo = np.asarray(starts, dtype=np.int64).copy()
+    hi = np.asarray(ends, dtype=np.int64).copy()
+    if len(indices) == 0:
+        return lo
+    active = lo < hi
+    while active.any():
+        mid = (lo + hi) // 2
+        go_right = active & (indices[np.minimum(mid, len(indices) - 1)] < keys)
+        lo = np.where(go_right, mid + 1, lo)
+        hi = np.where(active & ~go_right, mid, hi)
+        active = lo < hi
+    return lo
+
+
+def _search_segments(indptr, indices, segments, keys):
+    """
+    Vectorized lookup of each key inside its own sorted segment indices[indptr[s]:indptr[s+1]].
+    Used for row lookups in CSR and column lookups in CSC.
+
+    Returns:
+        tuple: (positions into `indices`, boolean mask of keys that were found).
+    """
+    segment_end = indptr[segments + 1].astype(np.int64)
+    lo = bisect_segments(indptr[segments], segment_end, indices, keys)
+    if len(indices) == 0:
+        return lo, np.zeros(lo.shape, dtype=bool)
+    pos = np.minimum(lo, len(indices) - 1)
+    found = (lo < segment_end) & (indices[pos] == keys)
+    return pos, found
+
+
 class DOK(SparseFormat):
     """
     Dictionary of Keys (DOK) sparse format.
@@ -53,53 +169,299 @@ class DOK(SparseFormat):
             del self.pixels[(row, col)]
             self.nnz -= 1
             
-    def to_dense(self):
-        arr = np.zeros(self.shape, dtype=self.dtype)
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
         for (row, col), value in self.pixels.items():
             arr[row, col] = value
         return arr
 
 
-class COO(SparseFormat):
+class HashDOK(SparseFormat):
+    """
+    Compact Dictionary of Keys backed by NumPy arrays.
+    An open-addressing hash map (linear probing) from the int64 linear index
+    row * shape[1] + col to the pixel value, kept in two parallel arrays.
+    Costs ~20-40 bytes per non-zero instead of ~200 for a dict of tuples,
+    and supports vectorized set_pixels/get_pixels.
+    """
+    _EMPTY = -1
+    _DELETED = -2
+    _MAX_LOAD = 0.5
+    _HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)  # Fibonacci hashing
+
+    def __init__(self, shape, dtype=np.uint8, capacity=8):
+        super().__init__(shape, dtype)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Resets the table to an empty power-of-two capacity of at least `capacity` slots."""
+        capacity = 1 << max(3, int(capacity - 1).bit_length())
+        self.keys = np.full(capacity, self._EMPTY, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=self.dtype)
+        self._used = 0  # live entries plus tombstones
+        self.nnz = 0
+
+    def _home_slots(self, keys):
+        shift = np.uint64(64 - (len(self.keys).bit_length() - 1))
+        return ((keys.astype(np.uint64) * self._HASH_MULTIPLIER) >> shift).astype(np.int64)
+
+    def _find(self, keys):
+        """Returns the slot holding each key, or -1 where the key is absent."""
+        mask = len(self.keys) - 1
+        slots = self._home_slots(keys)
+        result = np.full(len(keys), -1, dtype=np.int64)
+        active = np.arange(len(keys))
+        while len(active):
+            stored = self.keys[slots[active]]
+            hit = stored == keys[active]
+            result[active[hit]] = slots[active[hit]]
+            active = active[~(hit | (stored == self._EMPTY))]
+            slots[active] = (slots[active] + 1) & mask
+        return result
+
+    def _insert_new(self, keys, values):
+        """Inserts unique keys that are known to be absent, growing the table when needed."""
+        if self._used + len(keys) > self._MAX_LOAD * len(self.keys):
+            self._resize(int((self.nnz + len(keys)) / self._MAX_LOAD) + 1)
+        mask = len(self.keys) - 1
+        slots = self._home_slots(keys)
+        pending = np.arange(len(keys))
+        while len(pending):
+            free = self.keys[slots[pending]] < 0
+            candidates = pending[free]
+            # Several keys may probe the same free slot; the first one claims it
+            _, first = np.unique(slots[candidates], return_index=True)
+            winners = candidates[first]
+            self._used += int(np.count_nonzero(self.keys[slots[winners]] == self._EMPTY))
+            self.keys[slots[winners]] = keys[winners]
+            self.values[slots[winners]] = values[winners]
+            pending = np.setdiff1d(pending, winners, assume_unique=True)
+            slots[pending] = (slots[pending] + 1) & mask
+        self.nnz += len(keys)
+
+    def _resize(self, capacity):
+        live = self.keys >= 0
+        keys, values = self.keys[live], self.values[live]
+        self._allocate(capacity)
+        self._insert_new(keys, values)
+
+    def _linear_index(self, rows, cols):
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        return rows, rows * self.shape[1] + cols
+
+    def get_pixel(self, row, col):
+        return self.get_pixels(row, col)[()]
+
+    def get_pixels(self, rows, cols):
+        rows, keys = self._linear_index(rows, cols)
+        slots = self._find(keys.ravel())
+        out = np.where(slots >= 0, self.values[slots], 0).astype(self.dtype)
+        return out.reshape(rows.shape)
+
+    def set_pixel(self, row, col, value):
+        self.set_pixels(row, col, value)
+
+    def set_pixels(self, rows, cols, values):
+        """
+        Sets a batch of pixels at once. A value of 0 deletes the pixel.
+        When a coordinate appears several times, the last value wins.
+        """
+        _, keys = self._linear_index(rows, cols)
+        keys = keys.ravel()
+        values = np.broadcast_to(np.asarray(values, dtype=self.dtype), keys.shape).ravel()
+        # Keep the last occurrence of every key
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        keys, values = keys[last], values[last]
+        slots = self._find(keys)
+        deleting = values == 0
+        removed = slots[deleting & (slots >= 0)]
+        self.keys[removed] = self._DELETED
+        self.nnz -= len(removed)
+        updating = ~deleting & (slots >= 0)
+        self.values[slots[updating]] = values[updating]
+        inserting = ~deleting & (slots < 0)
+        self._insert_new(keys[inserting], values[inserting])
+
+    def to_arrays(self):
+        """Returns the (row, col, data) arrays of all stored pixels in row-major order."""
+        live = self.keys >= 0
+        keys, values = self.keys[live], self.values[live]
+        order = np.argsort(keys)
+        rows, cols = np.divmod(keys[order], self.shape[1])
+        return rows, cols, values[order]
+
+    @property
+    def pixels(self):
+        """A {(row, col): value} dict snapshot, for code written against DOK."""
+        rows, cols, data = self.to_arrays()
+        return dict(zip(zip(rows.tolist(), cols.tolist()), data.tolist()))
+
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
+        live = self.keys >= 0
+        rows, cols = np.divmod(self.keys[live], self.shape[1])
+        arr[rows, cols] = self.values[live]
+        return arr
+
+
+class COO(ElementwiseMixin, SparseFormat):
     """
     Coordinate List (COO) sparse format.
-    Stores lists of row indices, column indices, and values.
+    Stores NumPy arrays of row indices, column indices, and values.
     Good for simple and fast construction.
     """
     def __init__(self, shape, dtype=np.uint8):
         super().__init__(shape, dtype)
-        self.row = []
-        self.col = []
-        self.data = []
+        index_dtype = self.index_dtype(shape)
+        self.row = np.array([], dtype=index_dtype)
+        self.col = np.array([], dtype=index_dtype)
+        self.data = np.array([], dtype=self.dtype)
+
+    # row/col/data are properties so that replacing any of them drops the lookup
+    # cache. They are returned as read-only views: an in-place edit such as
+    # coo.row[1] = 0 would leave the cache stale, so it fails instead; assign a
+    # new array (coo.row = new_row) to change them.
+    @staticmethod
+    def _read_only(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def row(self):
+        return self._read_only(self._row)
+
+    @row.setter
+    def row(self, value):
+        self._row = value
+        self._lookup = None
+
+    @property
+    def col(self):
+        return self._read_only(self._col)
+
+    @col.setter
+    def col(self, value):
+        self._col = value
+        self._lookup = None
+
+    @property
+    def data(self):
+        return self._read_only(self._data)
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._lookup = None
+
+    @staticmethod
+    def index_dtype(shape):
+        """Returns the narrowest unsigned integer dtype that can hold every row and column index of `shape`."""
+        return np.uint16 if max(shape) < 2**16 else np.uint32
+
+    @classmethod
+    def from_arrays(cls, row, col, data, shape, dtype=None):
+        """
+        Builds a COO matrix from parallel row, column and value arrays.
+
+        Args:
+            row, col (array-like): Coordinates of the non-zero elements.
+            data (array-like): Values of the non-zero elements.
+            shape (tuple): (rows, cols) of the matrix.
+            dtype: Value dtype. Defaults to the dtype of `data`.
+
+        Returns:
+            COO: A new COO matrix holding contiguous copies of the arrays.
+        """
+        data = np.asarray(data)
+        coo = cls(shape, dtype=data.dtype if dtype is None else dtype)
+        index_dtype = coo.row.dtype
+        coo.row = np.ascontiguousarray(row, dtype=index_dtype)
+        coo.col = np.ascontiguousarray(col, dtype=index_dtype)
+        coo.data = np.ascontiguousarray(data, dtype=coo.dtype)
+        if not (len(coo.row) == len(coo.col) == len(coo.data)):
+            raise ValueError("row, col and data must have the same length.")
+        coo.nnz = len(coo.data)
+        return coo
+
+    @classmethod
+    def from_linear_index(cls, idx, data, shape, dtype=None):
+        """
+        Builds a COO matrix from row-major linear indices (row * shape[1] + col).
+
+        Args:
+            idx (array-like): Linear indices of the non-zero elements.
+            data (array-like): Values of the non-zero elements.
+            shape (tuple): (rows, cols) of the matrix.
+            dtype: Value dtype. Defaults to the dtype of `data`.
+
+        Returns:
+            COO: A new COO matrix.
+        """
+        row, col = np.divmod(np.asarray(idx, dtype=np.int64), shape[1])
+        return cls.from_arrays(row, col, data, shape, dtype)
+
+    def linear_index(self):
+        """Returns the row-major linear index (row * shape[1] + col) of every stored element as int64."""
+        return np.asarray(self.row, dtype=np.int64) * self.shape[1] + np.asarray(self.col, dtype=np.int64)
+
+    def _sorted_lookup(self):
+        """Lazily builds (sorted linear indices, permutation into data), reset whenever row/col/data change."""
+        if self._lookup is None:
+            keys = self.linear_index()
+            order = np.argsort(keys, kind='stable')
+            self._lookup = (keys[order], order)
+        return self._lookup
 
     def get_pixel(self, row, col):
-        # Inefficient for COO, but provided for completeness.
-        try:
-            for i, (r, c) in enumerate(zip(self.row, self.col)):
-                if r == row and c == col:
-                    return self.data[i]
-        except Exception:
-            pass
-        return 0
+        return self.get_pixels(row, col)[()]
+
+    def get_pixels(self, rows, cols):
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        out = np.zeros(rows.shape, dtype=self.dtype)
+        if len(self.data) == 0:
+            return out
+        keys, order = self._sorted_lookup()
+        query = rows * self.shape[1] + cols
+        # Take the last duplicate so lookups agree with to_dense
+        pos = np.searchsorted(keys, query, side='right') - 1
+        found = (pos >= 0) & (keys[np.maximum(pos, 0)] == query)
+        out[found] = np.asarray(self.data)[order[pos[found]]]
+        return out
 
     def set_pixel(self, row, col, value):
         # Very inefficient for COO. Better to build from a list of coordinates.
         raise NotImplementedError("set_pixel is inefficient for COO. Construct from data instead.")
 
-    def to_dense(self):
-        arr = np.zeros(self.shape, dtype=self.dtype)
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
         arr[self.row, self.col] = self.data
         self.nnz = len(self.data)
         return arr
 
 
-class CSR(SparseFormat):
+class CSR(ElementwiseMixin, SparseFormat):
     """
     Compressed Sparse Row (CSR) format.
     Efficient for row slicing and matrix-vector products.
+
+    CSR is also mutable: set_pixel/set_pixels record edits in a small sorted
+    delta buffer (linear index -> value, 0 meaning deleted) that reads merge
+    with the base arrays. Once the buffer passes `delta_threshold` entries it is
+    compacted into fresh indptr/indices/data. Reading indptr, indices or data
+    directly compacts first, so code working on the raw arrays never sees a
+    stale matrix.
     """
-    def __init__(self, shape, dtype=np.uint8):
+    MIN_DELTA_THRESHOLD = 1024
+
+    def __init__(self, shape, dtype=np.uint8, delta_threshold=None):
         super().__init__(shape, dtype)
+        # Pending edits, sorted by linear index row * shape[1] + col
+        self._delta_keys = np.array([], dtype=np.int64)
+        self._delta_values = np.array([], dtype=self.dtype)
+        # None picks max(MIN_DELTA_THRESHOLD, nnz // 8) at each edit
+        self.delta_threshold = delta_threshold
         # indptr (row pointers): points to the start of each row in col_idx/data
         # Example: [0, 2, 3, 5] means row 0 is data[0:2], row 1 is data[2:3], row 2 is data[3:5]
         self.indptr = np.zeros(self.shape[0] + 1, dtype=np.int32)
@@ -108,21 +470,258 @@ class CSR(SparseFormat):
         # data: non-zero values
         self.data = np.array([], dtype=self.dtype)
 
+    # Raw access to the base arrays compacts any pending edits first
+    @property
+    def indptr(self):
+        self.compact()
+        return self._indptr
+
+    @indptr.setter
+    def indptr(self, value):
+        self._indptr = value
+
+    @property
+    def indices(self):
+        self.compact()
+        return self._indices
+
+    @indices.setter
+    def indices(self, value):
+        self._indices = value
+
+    @property
+    def data(self):
+        self.compact()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    def _base_pixels(self, rows, cols):
+        """Looks up pixels in the base arrays only, ignoring pending edits."""
+        out = np.zeros(rows.shape, dtype=self.dtype)
+        pos, found = _search_segments(self._indptr, self._indices, rows, cols)
+        out[found] = self._data[pos[found]]
+        return out
+
     def get_pixel(self, row, col):
-        row_start = self.indptr[row]
-        row_end = self.indptr[row + 1]
-        for i in range(row_start, row_end):
-            if self.indices[i] == col:
-                return self.data[i]
+        # Plain ints, so NumPy uint16 coordinates (e.g. from COO.row) cannot overflow the key
+        row, col = int(row), int(col)
+        if len(self._delta_keys):
+            key = row * self.shape[1] + col
+            i = np.searchsorted(self._delta_keys, key)
+            if i < len(self._delta_keys) and self._delta_keys[i] == key:
+                return self._delta_values[i]
+        row_start = self._indptr[row]
+        row_end = self._indptr[row + 1]
+        # Column indices are sorted within a row, so binary search the row slice
+        i = row_start + np.searchsorted(self._indices[row_start:row_end], col)
+        if i < row_end and self._indices[i] == col:
+            return self._data[i]
         return 0
 
+    def get_pixels(self, rows, cols):
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        out = self._base_pixels(rows, cols)
+        if len(self._delta_keys):
+            keys = rows * self.shape[1] + cols
+            pos = np.minimum(np.searchsorted(self._delta_keys, keys), len(self._delta_keys) - 1)
+            found = self._delta_keys[pos] == keys
+            out[found] = self._delta_values[pos[found]]
+        return out
+
     def set_pixel(self, row, col, value):
-        raise NotImplementedError("set_pixel is inefficient for CSR. Construct from another format.")
+        row, col = int(row), int(col)
+        previous = self.get_pixel(row, col)
+        self.nnz += int(value != 0) - int(previous != 0)
+        key = row * self.shape[1] + col
+        i = np.searchsorted(self._delta_keys, key)
+        if i < len(self._delta_keys) and self._delta_keys[i] == key:
+            self._delta_values[i] = value
+        else:
+            self._delta_keys = np.insert(self._delta_keys, i, key)
+            self._delta_values = np.insert(self._delta_values, i, value)
+        self._maybe_compact()
 
-    def to_dense(self):
-        arr = np.zeros(self.shape, dtype=self.dtype)
-        for r in range(self.shape[0]):
-            for i in range(self.indptr[r], self.indptr[r+1]):
-                arr[r, self.indices[i]] = self.data[i]
+    def set_pixels(self, rows, cols, values):
+        """
+        Edits a batch of pixels. A value of 0 deletes the pixel; when a coordinate
+        appears several times the last value wins. Edits go to the delta buffer,
+        which is compacted into the base arrays once it grows past the threshold.
+        """
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        keys = (rows * self.shape[1] + cols).ravel()
+        values = np.broadcast_to(np.asarray(values, dtype=self.dtype), keys.shape).ravel()
+        # Keep the last occurrence of every key
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        keys, values = keys[last], values[last]
+        previous = self.get_pixels(*np.divmod(keys, self.shape[1]))
+        self.nnz += int(np.count_nonzero(values)) - int(np.count_nonzero(previous))
+        # Merge into the sorted delta, new edits replacing older ones for the same pixel
+        keep = ~np.isin(self._delta_keys, keys, assume_unique=True)
+        merged_keys = np.concatenate([self._delta_keys[keep], keys])
+        merged_values = np.concatenate([self._delta_values[keep], values])
+        order = np.argsort(merged_keys, kind='stable')
+        self._delta_keys, self._delta_values = merged_keys[order], merged_values[order]
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        threshold = self.delta_threshold
+        if threshold is None:
+            threshold = max(self.MIN_DELTA_THRESHOLD, self.nnz // 8)
+        if len(self._delta_keys) > threshold:
+            self.compact()
+
+    def compact(self):
+        """Folds pending edits into fresh indptr/indices/data arrays."""
+        if not len(self._delta_keys):
+            return
+        delta_keys, delta_values = self._delta_keys, self._delta_values
+        self._delta_keys = np.array([], dtype=np.int64)
+        self._delta_values = np.array([], dtype=self.dtype)
+        rows = np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self._indptr))
+        base_keys = rows * self.shape[1] + self._indices
+        # Drop base entries that were edited, then splice in the non-zero edits
+        keep = ~np.isin(base_keys, delta_keys, assume_unique=True)
+        base_keys, base_values = base_keys[keep], self._data[keep]
+        nonzero = delta_values != 0
+        delta_keys, delta_values = delta_keys[nonzero], delta_values[nonzero]
+        at = np.searchsorted(base_keys, delta_keys)
+        keys = np.insert(base_keys, at, delta_keys)
+        new_rows, new_cols = np.divmod(keys, self.shape[1])
+        self._indptr = np.zeros(self.shape[0] + 1, dtype=np.int32)
+        self._indptr[1:] = np.cumsum(np.bincount(new_rows, minlength=self.shape[0]))
+        self._indices = new_cols.astype(np.int32)
+        self._data = np.insert(base_values, at, delta_values).astype(self.dtype)
+        self.nnz = len(self._data)
+
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
+        # Expand indptr into one row id per stored element, then scatter in a single assignment
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self._indptr))
+        arr[rows, self._indices] = self._data
+        if len(self._delta_keys):
+            # Pending edits overwrite the base, zeros included
+            delta_rows, delta_cols = np.divmod(self._delta_keys, self.shape[1])
+            arr[delta_rows, delta_cols] = self._delta_values
+        else:
+            self.nnz = len(self._data)
+        return arr
+
+
+class CSC(SparseFormat):
+    """
+    Compressed Sparse Column (CSC) format.
+    The column-major twin of CSR: efficient for column slicing, vertical flips
+    and column-wise statistics.
+    """
+    def __init__(self, shape, dtype=np.uint8):
+        super().__init__(shape, dtype)
+        # indptr (column pointers): column c is indices/data[indptr[c]:indptr[c+1]]
+        self.indptr = np.zeros(self.shape[1] + 1, dtype=np.int32)
+        # indices (row indices): row index for each non-zero value, sorted within a column
+        self.indices = np.array([], dtype=np.int32)
+        # data: non-zero values
+        self.data = np.array([], dtype=self.dtype)
+
+    def get_pixel(self, row, col):
+        col_start = self.indptr[col]
+        col_end = self.indptr[col + 1]
+        i = col_start + np.searchsorted(self.indices[col_start:col_end], row)
+        if i < col_end and self.indices[i] == row:
+            return self.data[i]
+        return 0
+
+    def get_pixels(self, rows, cols):
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        out = np.zeros(rows.shape, dtype=self.dtype)
+        pos, found = _search_segments(self.indptr, self.indices, cols, rows)
+        out[found] = self.data[pos[found]]
+        return out
+
+    def get_cols(self, start, stop):
+        """
+        Slices out the columns [start, stop) as a new CSC matrix.
+        Only the stored elements of those columns are touched; indices and data are views on this matrix.
+
+        Args:
+            start (int): First column to keep.
+            stop (int): One past the last column to keep.
+
+        Returns:
+            CSC: A matrix of shape (rows, stop - start).
+        """
+        if not 0 <= start <= stop <= self.shape[1]:
+            raise ValueError("Invalid column range.")
+        lo, hi = self.indptr[start], self.indptr[stop]
+        csc = CSC((self.shape[0], stop - start), dtype=self.dtype)
+        csc.indptr = self.indptr[start:stop + 1] - lo
+        csc.indices = self.indices[lo:hi]
+        csc.data = self.data[lo:hi]
+        csc.nnz = len(csc.data)
+        return csc
+
+    def set_pixel(self, row, col, value):
+        raise NotImplementedError("set_pixel is inefficient for CSC. Construct from another format.")
+
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
+        cols = np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+        arr[self.indices, cols] = self.data
         self.nnz = len(self.data)
         return arr
+
+
+class BSR(SparseFormat):
+    """
+    Block Sparse Row (BSR) format.
+    Splits the image into fixed-size square tiles and stores only the non-empty ones
+    as dense sub-arrays, indexed like CSR over block rows. Good for images whose
+    content is clustered (text blocks, logos), where per-pixel indices cost more
+    than the pixels themselves.
+    """
+    def __init__(self, shape, dtype=np.uint8, block_size=16):
+        super().__init__(shape, dtype)
+        if block_size < 1:
+            raise ValueError("Block size must be a positive integer.")
+        self.block_size = block_size
+        self.block_shape = (-(-shape[0] // block_size), -(-shape[1] // block_size))
+        # indptr (block row pointers): block row i is indices/blocks[indptr[i]:indptr[i+1]]
+        self.indptr = np.zeros(self.block_shape[0] + 1, dtype=np.int32)
+        # indices: block column of each stored tile, sorted within a block row
+        self.indices = np.array([], dtype=np.int32)
+        # blocks: (n_blocks, block_size, block_size) dense tiles
+        self.blocks = np.zeros((0, block_size, block_size), dtype=self.dtype)
+
+    def get_pixel(self, row, col):
+        return self.get_pixels(row, col)[()]
+
+    def get_pixels(self, rows, cols):
+        rows, cols = np.broadcast_arrays(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))
+        out = np.zeros(rows.shape, dtype=self.dtype)
+        bs = self.block_size
+        pos, found = _search_segments(self.indptr, self.indices, rows // bs, cols // bs)
+        out[found] = self.blocks[pos[found], rows[found] % bs, cols[found] % bs]
+        return out
+
+    def set_pixel(self, row, col, value):
+        raise NotImplementedError("set_pixel is inefficient for BSR. Construct from another format.")
+
+    def to_dense(self, out=None):
+        arr = self._dense_buffer(out)
+        bs = self.block_size
+        padded_shape = (self.block_shape[0] * bs, self.block_shape[1] * bs)
+        if padded_shape == self.shape and arr.flags.c_contiguous:
+            padded = arr
+        else:
+            padded = np.zeros(padded_shape, dtype=self.dtype)
+        block_rows = np.repeat(np.arange(self.block_shape[0]), np.diff(self.indptr))
+        # View the image as a grid of tiles and copy every stored tile in one assignment
+        tiles = padded.reshape(self.block_shape[0], bs, self.block_shape[1], bs).transpose(0, 2, 1, 3)
+        tiles[block_rows, self.indices] = self.blocks
+        if padded is not arr:
+            arr[...] = padded[:self.shape[0], :self.shape[1]]
+        self.nnz = int(np.count_nonzero(self.blocks))
+        return arr
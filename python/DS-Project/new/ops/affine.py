@@ -0,0 +1,127 @@
+import numpy as np
+from core.sparse_formats import COO
+from core.ds_utils import convert, convert_like
+
+# Coordinates are (row, col) throughout, like the rest of ops/: a matrix
+# [[a, b, tr], [d, e, tc]] maps (r, c) to (a*r + b*c + tr, d*r + e*c + tc).
+
+def rotation_matrix(degrees, shape):
+    """
+    Returns the 2x3 matrix that rotates an image of `shape` clockwise by `degrees` about its centre.
+    degrees=90 matches ops.rotate.rotate90 up to the output offset.
+    """
+    theta = np.deg2rad(degrees)
+    cos, sin = np.cos(theta), np.sin(theta)
+    linear = np.array([[cos, sin], [-sin, cos]])
+    center = (np.array(shape, dtype=np.float64) - 1) / 2
+    return np.hstack([linear, (center - linear @ center)[:, None]])
+
+def shear_matrix(row_shear=0.0, col_shear=0.0):
+    """Returns the 2x3 matrix that shifts each row by col_shear * row and each column by row_shear * col."""
+    return np.array([[1.0, row_shear, 0.0], [col_shear, 1.0, 0.0]])
+
+def _round_coords(mapped):
+    """
+    Rounds mapped coordinates to the nearest pixel, halves up. np.rint rounds halves
+    to even, which merges neighbours when a warp lands every pixel on .5.
+    Float noise (cos(90deg) is 6e-17) is removed first so exact halves stay exact.
+    """
+    return np.floor(np.round(mapped, 9) + 0.5)
+
+def _output_frame(matrix, shape):
+    """
+    Bounding box of the transformed input frame, from its rounded corners.
+
+    Returns:
+        tuple: (output shape, integer offset that moves the top-left corner to 0).
+    """
+    h, w = shape
+    corners = np.array([[0, 0], [0, w - 1], [h - 1, 0], [h - 1, w - 1]], dtype=np.float64)
+    mapped = _round_coords(corners @ matrix[:, :2].T + matrix[:, 2])
+    low, high = mapped.min(axis=0), mapped.max(axis=0)
+    return tuple(int(n) for n in high - low + 1), -low
+
+def _reduce(keys, values, collision):
+    """Combines values that landed on the same output key. Returns (unique keys, combined values)."""
+    unique_keys, slot = np.unique(keys, return_inverse=True)
+    if collision == 'max':
+        combined = np.full(len(unique_keys), -np.inf)
+        np.maximum.at(combined, slot, values)
+    elif collision == 'mean':
+        combined = np.bincount(slot, weights=values, minlength=len(unique_keys))
+        combined = combined / np.maximum(np.bincount(slot, minlength=len(unique_keys)), 1)
+    elif collision == 'sum':
+        combined = np.bincount(slot, weights=values, minlength=len(unique_keys))
+    else:
+        raise ValueError("Collision mode must be 'max', 'mean' or 'sum'")
+    return unique_keys, combined
+
+def _to_dtype(values, dtype):
+    """Rounds and clips float results into `dtype`."""
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu':
+        info = np.iinfo(dtype)
+        return np.clip(np.rint(values), info.min, info.max).astype(dtype)
+    return values.astype(dtype)
+
+def affine(sparse_obj, matrix, interpolation='nearest', output_shape=None, collision='max'):
+    """
+    Warps a sparse image with an affine map of its non-zero coordinates.
+    Cost is O(nnz) and the result stays sparse.
+
+    Args:
+        sparse_obj: The sparse object to warp.
+        matrix (array-like): 2x3 (or 3x3 homogeneous) forward map in (row, col) coordinates.
+        interpolation (str): 'nearest' rounds every mapped pixel to the closest output pixel;
+            'bilinear' splats it onto its four neighbours with bilinear weights and normalizes
+            each output pixel by the total weight it received (capped below at 1, so edges fade).
+        output_shape (tuple): Output (rows, cols). If None, the canvas is grown to fit the whole
+            transformed image and shifted so that it starts at (0, 0).
+        collision (str): How 'nearest' combines several pixels landing on the same output pixel:
+            'max', 'mean' or 'sum'. Results do not depend on the storage order.
+
+    Returns:
+        A new sparse object of the same type.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)[:2]
+    if matrix.shape != (2, 3):
+        raise ValueError("Matrix must be 2x3 or 3x3.")
+    if output_shape is None:
+        output_shape, shift = _output_frame(matrix, sparse_obj.shape)
+        matrix = matrix.copy()
+        matrix[:, 2] += shift
+    output_shape = tuple(output_shape)
+
+    coo = convert(sparse_obj, COO)
+    coords = np.stack([coo.row.astype(np.float64), coo.col.astype(np.float64)], axis=1)
+    mapped = coords @ matrix[:, :2].T + matrix[:, 2]
+    values = np.asarray(coo.data, dtype=np.float64)
+
+    if interpolation == 'nearest':
+        rows, cols = _round_coords(mapped).astype(np.int64).T
+        inside = (rows >= 0) & (rows < output_shape[0]) & (cols >= 0) & (cols < output_shape[1])
+        keys, combined = _reduce(rows[inside] * output_shape[1] + cols[inside], values[inside], collision)
+    elif interpolation == 'bilinear':
+        base = np.floor(mapped)
+        frac = mapped - base
+        base = base.astype(np.int64)
+        keys, weights, weighted = [], [], []
+        for dr, dc in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            weight = (frac[:, 0] if dr else 1 - frac[:, 0]) * (frac[:, 1] if dc else 1 - frac[:, 1])
+            rows, cols = base[:, 0] + dr, base[:, 1] + dc
+            inside = (rows >= 0) & (rows < output_shape[0]) & (cols >= 0) & (cols < output_shape[1]) & (weight > 0)
+            keys.append(rows[inside] * output_shape[1] + cols[inside])
+            weights.append(weight[inside])
+            weighted.append(weight[inside] * values[inside])
+        keys, slot = np.unique(np.concatenate(keys), return_inverse=True)
+        total_weight = np.bincount(slot, weights=np.concatenate(weights), minlength=len(keys))
+        combined = np.bincount(slot, weights=np.concatenate(weighted), minlength=len(keys))
+        combined = combined / np.maximum(total_weight, 1.0)
+    else:
+        raise ValueError("Interpolation must be 'nearest' or 'bilinear'")
+
+    combined = _to_dtype(combined, coo.dtype)
+    nonzero = combined != 0
+    rows, cols = np.divmod(keys[nonzero], output_shape[1])
+    result = COO.from_arrays(rows, cols, combined[nonzero], output_shape, dtype=coo.dtype)
+    return convert_like(result, sparse_obj)
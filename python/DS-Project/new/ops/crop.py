@@ -1,13 +1,46 @@
-from core.sparse_formats import DOK
-from core.ds_utils import csr_to_dok, dok_to_csr, dok_to_coo
+import numpy as np
+from core.sparse_formats import COO, CSR, CSC, bisect_segments
+from core.ds_utils import convert, convert_like
 
-def crop(sparse_obj, box):
+def _crop_compressed(indptr, indices, data, major_range, minor_range, full_lines=False, copy=True):
+    """
+    Crops a compressed (CSR/CSC) layout. Only the pointers of the major range
+    and the elements inside the box are touched: each major line is binary
+    searched for the minor bounds.
+
+    Returns:
+        tuple: (indptr, indices, data) of the cropped matrix.
+    """
+    (m1, m2), (n1, n2) = major_range, minor_range
+    if full_lines:
+        # The box spans whole lines: the result is a contiguous slice of the parent
+        lo, hi = indptr[m1], indptr[m2]
+        new_indptr = (indptr[m1:m2 + 1] - lo).astype(np.int32)
+        new_indices, new_data = indices[lo:hi], data[lo:hi]
+        if copy:
+            new_indices, new_data = new_indices.copy(), new_data.copy()
+        return new_indptr, new_indices, new_data
+    starts = indptr[m1:m2].astype(np.int64)
+    ends = indptr[m1 + 1:m2 + 1].astype(np.int64)
+    lo = bisect_segments(starts, ends, indices, n1)
+    hi = bisect_segments(lo, ends, indices, n2)
+    counts = hi - lo
+    new_indptr = np.zeros(len(counts) + 1, dtype=np.int32)
+    new_indptr[1:] = np.cumsum(counts)
+    # Position of every kept element in the parent arrays
+    line = np.repeat(np.arange(len(counts)), counts)
+    gather = lo[line] + np.arange(new_indptr[-1]) - new_indptr[line]
+    return new_indptr, (indices[gather] - n1).astype(np.int32), data[gather]
+
+def crop(sparse_obj, box, copy=True):
     """
     Crops a sparse object to a given bounding box.
 
     Args:
         sparse_obj: The sparse object to crop.
         box (tuple): A tuple of (x1, y1, x2, y2) defining the crop box.
+        copy (bool): If False and the box spans full rows (CSR) or full columns (CSC),
+            the result's indices and data are zero-copy views on the parent's arrays.
 
     Returns:
         A new sparse object of the same type, cropped.
@@ -16,25 +49,25 @@ def crop(sparse_obj, box):
     if not (0 <= x1 < x2 <= sparse_obj.shape[1] and 0 <= y1 < y2 <= sparse_obj.shape[0]):
         raise ValueError("Invalid crop box dimensions.")
 
-    # Convert to DOK for easiest manipulation
-    if sparse_obj.__class__.__name__ != 'DOK':
-        dok = csr_to_dok(sparse_obj) # This assumes CSR or COO can be converted from CSR
-    else:
-        dok = sparse_obj
+    new_shape = (y2 - y1, x2 - x1)
+    full_width, full_height = (x1 == 0 and x2 == sparse_obj.shape[1]), (y1 == 0 and y2 == sparse_obj.shape[0])
 
-    new_width = x2 - x1
-    new_height = y2 - y1
-    new_dok = DOK(shape=(new_height, new_width), dtype=dok.dtype)
+    # CSR/CSC: slice the pointer range, binary search the other axis
+    if isinstance(sparse_obj, (CSR, CSC)):
+        is_csr = isinstance(sparse_obj, CSR)
+        major, minor = ((y1, y2), (x1, x2)) if is_csr else ((x1, x2), (y1, y2))
+        full_lines = full_width if is_csr else full_height
+        cropped = sparse_obj.__class__(new_shape, dtype=sparse_obj.dtype)
+        cropped.indptr, cropped.indices, cropped.data = _crop_compressed(
+            sparse_obj.indptr, sparse_obj.indices, sparse_obj.data, major, minor, full_lines, copy)
+        cropped.nnz = len(cropped.data)
+        return cropped
 
-    for (r, c), value in dok.pixels.items():
-        if x1 <= c < x2 and y1 <= r < y2:
-            # Remap coordinates to the new cropped dimensions
-            new_dok.set_pixel(r - y1, c - x1, value)
+    # Everything else: one vectorized mask over the coordinates
+    coo = convert(sparse_obj, COO)
+    rows, cols = coo.row.astype(np.int64), coo.col.astype(np.int64)
+    inside = (rows >= y1) & (rows < y2) & (cols >= x1) & (cols < x2)
+    cropped = COO.from_arrays(rows[inside] - y1, cols[inside] - x1, np.asarray(coo.data)[inside], new_shape, dtype=coo.dtype)
 
     # Convert back to the original format
-    if sparse_obj.__class__.__name__ == 'CSR':
-        return dok_to_csr(new_dok)
-    elif sparse_obj.__class__.__name__ == 'COO':
-        return dok_to_coo(new_dok)
-        
-    return new_dok
+    return convert_like(cropped, sparse_obj)
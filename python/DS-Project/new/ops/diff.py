@@ -0,0 +1,83 @@
+import numpy as np
+from core.algebra import linear_entries, from_linear_entries, align
+from core.ds_utils import convert_like
+
+class Patch:
+    """
+    The pixels that differ between two revisions of a sparse image.
+
+    Stored as sorted row-major linear indices with the new value of every
+    touched pixel (0 means cleared, like the CSR delta buffer) and its old
+    value, so a patch can also be reverted.
+    """
+    def __init__(self, shape, dtype, keys, values, previous):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.values = np.asarray(values, dtype=self.dtype)
+        self.previous = np.asarray(previous, dtype=self.dtype)
+        if not (len(self.keys) == len(self.values) == len(self.previous)):
+            raise ValueError("Patch keys, values and previous values must have the same length.")
+
+    @property
+    def nnz(self):
+        """Number of touched pixels."""
+        return len(self.keys)
+
+    @property
+    def set_keys(self):
+        """Pixels that were background and are now set."""
+        return self.keys[self.previous == 0]
+
+    @property
+    def changed_keys(self):
+        """Pixels that were set and now hold a different non-zero value."""
+        return self.keys[(self.previous != 0) & (self.values != 0)]
+
+    @property
+    def cleared_keys(self):
+        """Pixels that were set and are now background."""
+        return self.keys[self.values == 0]
+
+    def inverse(self):
+        """The patch that undoes this one."""
+        return Patch(self.shape, self.dtype, self.keys, self.previous, self.values)
+
+def _nonzero_entries(sparse_obj):
+    keys, values = linear_entries(sparse_obj)
+    nonzero = values != 0
+    return keys[nonzero], values[nonzero]
+
+def diff(a, b):
+    """
+    Computes the patch that turns `a` into `b` with one merge of their sorted linear indices.
+
+    Args:
+        a: The old revision.
+        b: The new revision, same shape.
+
+    Returns:
+        Patch: The set, changed and cleared pixels, in b's dtype.
+    """
+    if a.shape != b.shape:
+        raise ValueError(f"Shape mismatch: {a.shape} vs {b.shape}.")
+    keys, old, new = align(*_nonzero_entries(a), *_nonzero_entries(b))
+    differ = old != new
+    return Patch(b.shape, b.dtype, keys[differ], new[differ], old[differ])
+
+def apply_patch(sparse_obj, patch):
+    """
+    Applies a patch without densifying: patched pixels take the patch's values,
+    all others keep theirs.
+
+    Returns:
+        A new sparse object of the same type as `sparse_obj`.
+    """
+    if sparse_obj.shape != patch.shape:
+        raise ValueError(f"Shape mismatch: {sparse_obj.shape} vs {patch.shape}.")
+    keys_obj, values_obj = linear_entries(sparse_obj)
+    keys, values, _ = align(keys_obj, values_obj.astype(patch.dtype), patch.keys, patch.values)
+    values[np.searchsorted(keys, patch.keys)] = patch.values
+    nonzero = values != 0
+    result = from_linear_entries(sparse_obj, sparse_obj.shape, patch.dtype, keys[nonzero], values[nonzero])
+    return convert_like(result, sparse_obj)
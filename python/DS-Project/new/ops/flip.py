@@ -1,28 +1,51 @@
-from core.sparse_formats import DOK
-from core.ds_utils import csr_to_dok, dok_to_csr, coo_to_csr, dok_to_coo
+import numpy as np
+from core.sparse_formats import CSR
+from core.ds_utils import _csr_rows
+from ops.rotate import _remap, _remap_coo
+
+def _reverse_segments(indptr, counts):
+    """
+    For segments laid out by `indptr`, returns the gather order that lists the
+    segments back to front (counts are the new segment lengths, i.e. the old ones reversed).
+    """
+    new_indptr = np.concatenate([[0], np.cumsum(counts)])
+    segment = np.repeat(np.arange(len(counts)), counts)
+    offset = np.arange(new_indptr[-1]) - new_indptr[segment]
+    return new_indptr, indptr[len(counts) - 1 - segment] + offset
 
 def flip(sparse_obj, direction='vertical'):
     """Flips a sparse object vertically or horizontally."""
-    
-    if sparse_obj.__class__.__name__ != 'DOK':
-        dok = csr_to_dok(sparse_obj)
-    else:
-        dok = sparse_obj
-        
-    new_dok = DOK(dok.shape, dok.dtype)
-    
+    h, w = sparse_obj.shape
+
     if direction == 'vertical':
-        for (r, c), value in dok.pixels.items():
-            new_dok.set_pixel(dok.shape[0] - 1 - r, c, value)
+        def coo_remap(coo):
+            return _remap_coo(coo, h - 1 - coo.row.astype(np.int64), coo.col, sparse_obj.shape)
+
+        def csr_remap(csr):
+            # Reverse the order of the row blocks; each row's contents stay as they are
+            counts = np.diff(csr.indptr)[::-1]
+            new_indptr, gather = _reverse_segments(csr.indptr.astype(np.int64), counts)
+            new_csr = CSR(csr.shape, dtype=csr.dtype)
+            new_csr.indptr = new_indptr.astype(np.int32)
+            new_csr.indices = csr.indices[gather]
+            new_csr.data = csr.data[gather]
+            new_csr.nnz = len(new_csr.data)
+            return new_csr
     elif direction == 'horizontal':
-        for (r, c), value in dok.pixels.items():
-            new_dok.set_pixel(r, dok.shape[1] - 1 - c, value)
+        def coo_remap(coo):
+            return _remap_coo(coo, coo.row, w - 1 - coo.col.astype(np.int64), sparse_obj.shape)
+
+        def csr_remap(csr):
+            # Mirror the columns and reverse the element order inside every row
+            rows = _csr_rows(csr)
+            gather = csr.indptr[rows] + csr.indptr[rows + 1] - 1 - np.arange(len(csr.data))
+            new_csr = CSR(csr.shape, dtype=csr.dtype)
+            new_csr.indptr = csr.indptr.copy()
+            new_csr.indices = (w - 1 - csr.indices[gather]).astype(np.int32)
+            new_csr.data = csr.data[gather]
+            new_csr.nnz = len(new_csr.data)
+            return new_csr
     else:
         raise ValueError("Direction must be 'vertical' or 'horizontal'")
 
-    if sparse_obj.__class__.__name__ == 'CSR':
-        return dok_to_csr(new_dok)
-    elif sparse_obj.__class__.__name__ == 'COO':
-        return dok_to_coo(new_dok)
-        
-    return new_dok
+    return _remap(sparse_obj, coo_remap, csr_remap)
@@ -0,0 +1,136 @@
+import numpy as np
+from core.sparse_formats import CSR
+from core.ds_utils import convert, _csr_rows
+
+def _row_runs(csr):
+    """
+    Splits the stored non-zeros of a CSR into horizontal runs of consecutive columns.
+
+    Returns:
+        tuple: (run row, run first col, run last col, run id of every non-zero element,
+        boolean mask of the elements that are non-zero).
+    """
+    rows = _csr_rows(csr)
+    nonzero = csr.data != 0
+    rows, cols = rows[nonzero], csr.indices[nonzero].astype(np.int64)
+    if not len(rows):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, empty, nonzero
+    breaks = np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1] + 1)]
+    run_of = np.cumsum(breaks) - 1
+    starts = np.flatnonzero(breaks)
+    ends = np.r_[starts[1:], len(rows)] - 1
+    return rows[starts], cols[starts], cols[ends], run_of, nonzero
+
+def _adjacent_runs(run_rows, run_starts, run_ends, width, connectivity):
+    """
+    Finds every pair of runs on consecutive rows that touch.
+    Runs are sorted by (row, start) and disjoint within a row, so their ends
+    are sorted too and both bounds can be found with searchsorted on a
+    (row, column) composite key.
+
+    Returns:
+        tuple: (upper run ids, lower run ids) of all touching pairs.
+    """
+    reach = 1 if connectivity == 8 else 0
+    stride = width + 2
+    # Columns are shifted by one so that start - reach never goes negative
+    end_keys = run_rows * stride + run_ends + 1
+    start_keys = run_rows * stride + run_starts + 1
+    above = (run_rows - 1) * stride
+    first = np.searchsorted(end_keys, above + run_starts - reach + 1, side='left')
+    last = np.searchsorted(start_keys, above + run_ends + reach + 1, side='right')
+    counts = np.maximum(last - first, 0)
+    lower = np.repeat(np.arange(len(run_rows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    upper = np.repeat(first, counts) + offsets
+    return upper, lower
+
+def _union_find(n, upper, lower):
+    """Vectorized union-find: hooks roots onto the smaller root and compresses paths until every edge agrees."""
+    parent = np.arange(n)
+    while True:
+        root_a, root_b = parent[upper], parent[lower]
+        differ = root_a != root_b
+        if not differ.any():
+            return parent
+        low, high = np.minimum(root_a[differ], root_b[differ]), np.maximum(root_a[differ], root_b[differ])
+        np.minimum.at(parent, high, low)
+        # Pointer jumping until every node points at a root
+        while True:
+            grand = parent[parent]
+            if (grand == parent).all():
+                break
+            parent = grand
+
+def label(sparse_obj, connectivity=4):
+    """
+    Labels connected components of the non-zero pixels with a run-length union-find.
+    Pixels are grouped into horizontal runs per CSR row, runs on consecutive rows
+    that touch are united, and run labels are expanded back to pixels.
+
+    Args:
+        sparse_obj: The sparse image. Non-CSR inputs are converted to CSR first.
+        connectivity (int): 4 (edges only) or 8 (edges and corners).
+
+    Returns:
+        tuple: (labels, count). `labels` is aligned with the CSR `data` array
+        (1..count, in row-major order of first appearance; 0 for stored zeros).
+    """
+    if connectivity not in (4, 8):
+        raise ValueError("Connectivity must be 4 or 8.")
+    csr = convert(sparse_obj, CSR)
+    run_rows, run_starts, run_ends, run_of, nonzero = _row_runs(csr)
+    upper, lower = _adjacent_runs(run_rows, run_starts, run_ends, csr.shape[1], connectivity)
+    roots = _union_find(len(run_rows), upper, lower)
+    # Roots are the smallest run id of each component, so np.unique numbers them in row-major order
+    _, run_labels = np.unique(roots, return_inverse=True)
+    labels = np.zeros(len(nonzero), dtype=np.int32)
+    labels[nonzero] = run_labels[run_of] + 1
+    count = int(run_labels.max()) + 1 if len(run_labels) else 0
+    return labels, count
+
+def component_stats(sparse_obj, labels=None, connectivity=4):
+    """
+    Computes per-component statistics without densifying.
+
+    Args:
+        sparse_obj: The sparse image.
+        labels (np.ndarray): Output of label() for this image; computed if omitted.
+        connectivity (int): Used when labels are computed here.
+
+    Returns:
+        dict: Arrays indexed by label - 1: 'area', 'sum' (of pixel values),
+        'min_row', 'min_col', 'max_row', 'max_col' (inclusive bounding box),
+        'centroid_row', 'centroid_col'.
+    """
+    csr = convert(sparse_obj, CSR)
+    if labels is None:
+        labels, count = label(csr, connectivity)
+    else:
+        count = int(labels.max()) if len(labels) else 0
+    rows = _csr_rows(csr)
+    cols = csr.indices.astype(np.int64)
+    labelled = labels > 0
+    ids, rows, cols = labels[labelled] - 1, rows[labelled], cols[labelled]
+    values = csr.data[labelled].astype(np.float64)
+
+    area = np.bincount(ids, minlength=count)
+    stats = {
+        'area': area,
+        'sum': np.bincount(ids, weights=values, minlength=count),
+        'centroid_row': np.bincount(ids, weights=rows, minlength=count) / np.maximum(area, 1),
+        'centroid_col': np.bincount(ids, weights=cols, minlength=count) / np.maximum(area, 1),
+    }
+    # Bounding boxes: sort by component once, then reduce each group
+    order = np.argsort(ids, kind='stable')
+    starts = np.searchsorted(ids[order], np.arange(count))
+    if count:
+        stats['min_row'] = np.minimum.reduceat(rows[order], starts)
+        stats['max_row'] = np.maximum.reduceat(rows[order], starts)
+        stats['min_col'] = np.minimum.reduceat(cols[order], starts)
+        stats['max_col'] = np.maximum.reduceat(cols[order], starts)
+    else:
+        for key in ('min_row', 'max_row', 'min_col', 'max_col'):
+            stats[key] = np.array([], dtype=np.int64)
+    return stats
@@ -0,0 +1,137 @@
+import numpy as np
+from core.algebra import nonzero_entries, like_from_entries
+
+# Flat morphology: structuring-element offsets are applied to the coordinate
+# arrays and the shifted copies are merged on their sorted linear indices, so
+# cost is O(nnz x |SE|). Pixels outside the image count as background.
+
+def square(size=3):
+    """A size x size square structuring element."""
+    return np.ones((size, size), dtype=bool)
+
+def disk(radius=1):
+    """A disk-shaped structuring element of the given radius."""
+    r = np.arange(-radius, radius + 1)
+    return r[:, None] ** 2 + r[None, :] ** 2 <= radius ** 2
+
+def _offsets(selem):
+    """(row, col) offsets of the structuring element's set cells relative to its centre."""
+    selem = np.asarray(selem, dtype=bool)
+    if selem.ndim != 2 or not selem.any():
+        raise ValueError("Structuring element must be a non-empty 2D array.")
+    rows, cols = np.nonzero(selem)
+    return rows - selem.shape[0] // 2, cols - selem.shape[1] // 2
+
+def _shift(shape, rows, cols, dr, dc):
+    """Shifts coordinates by (dr, dc) and returns (linear keys, in-bounds mask)."""
+    new_rows, new_cols = rows + dr, cols + dc
+    inside = (new_rows >= 0) & (new_rows < shape[0]) & (new_cols >= 0) & (new_cols < shape[1])
+    return new_rows * shape[1] + new_cols, inside
+
+def dilate(sparse_obj, selem=None, binary=False):
+    """
+    Dilates a sparse image: every output pixel is the maximum of the input over
+    the (reflected) structuring element placed on it.
+
+    Args:
+        sparse_obj: The sparse object to dilate.
+        selem (array-like): Boolean structuring element, centred. Defaults to a 3x3 square.
+        binary (bool): Treat the input as a mask; every set output pixel gets the
+            input's maximum value and no per-pixel max is computed.
+
+    Returns:
+        A new sparse object of the same type.
+    """
+    d_rows, d_cols = _offsets(square() if selem is None else selem)
+    keys, values = nonzero_entries(sparse_obj)
+    rows, cols = np.divmod(keys, sparse_obj.shape[1])
+    shifted_keys, shifted_values = [], []
+    for dr, dc in zip(d_rows, d_cols):
+        shifted, inside = _shift(sparse_obj.shape, rows, cols, dr, dc)
+        shifted_keys.append(shifted[inside])
+        shifted_values.append(values[inside])
+    all_keys = np.concatenate(shifted_keys)
+    if binary:
+        out_keys = np.unique(all_keys)
+        fill = values.max() if len(values) else 0
+        return like_from_entries(sparse_obj, out_keys, np.full(len(out_keys), fill, dtype=sparse_obj.dtype))
+    # Sorted merge of the shifted copies, keeping the max per pixel
+    all_values = np.concatenate(shifted_values)
+    order = np.argsort(all_keys, kind='stable')
+    all_keys, all_values = all_keys[order], all_values[order]
+    starts = np.flatnonzero(np.r_[True, all_keys[1:] != all_keys[:-1]]) if len(all_keys) else np.array([], dtype=np.int64)
+    out_values = np.maximum.reduceat(all_values, starts) if len(starts) else all_values
+    return like_from_entries(sparse_obj, all_keys[starts], out_values)
+
+def erode(sparse_obj, selem=None, binary=False):
+    """
+    Erodes a sparse image: every output pixel is the minimum of the input over
+    the structuring element placed on it, so it survives only if all of its
+    neighbours under the element are set.
+
+    Args:
+        sparse_obj: The sparse object to erode.
+        selem (array-like): Boolean structuring element, centred. Defaults to a 3x3 square.
+        binary (bool): Treat the input as a mask and keep the surviving pixels' own values.
+
+    Returns:
+        A new sparse object of the same type.
+    """
+    d_rows, d_cols = _offsets(square() if selem is None else selem)
+    keys, values = nonzero_entries(sparse_obj)
+    rows, cols = np.divmod(keys, sparse_obj.shape[1])
+    # Candidates are pixels p for which p + offset is stored for every offset
+    candidates = None
+    for dr, dc in zip(d_rows, d_cols):
+        source, inside = _shift(sparse_obj.shape, rows, cols, -dr, -dc)
+        source = np.unique(source[inside])
+        candidates = source if candidates is None else np.intersect1d(candidates, source, assume_unique=True)
+    if binary:
+        # Surviving pixels keep their own value; with the origin in the element they are stored
+        pos = np.searchsorted(keys, candidates)
+        found = (pos < len(keys)) & (keys[np.minimum(pos, len(keys) - 1)] == candidates) if len(keys) else pos < 0
+        out_values = np.full(len(candidates), values.max() if len(values) else 0, dtype=sparse_obj.dtype)
+        out_values[found] = values[pos[found]]
+        return like_from_entries(sparse_obj, candidates, out_values)
+    cand_rows, cand_cols = np.divmod(candidates, sparse_obj.shape[1])
+    out_values = None
+    for dr, dc in zip(d_rows, d_cols):
+        neighbour = (cand_rows + dr) * sparse_obj.shape[1] + cand_cols + dc
+        neighbour_values = values[np.searchsorted(keys, neighbour)]
+        out_values = neighbour_values if out_values is None else np.minimum(out_values, neighbour_values)
+    if out_values is None:
+        out_values = values[:0]
+    return like_from_entries(sparse_obj, candidates, out_values)
+
+def erode_rows(sparse_obj, length=3):
+    """
+    Binary erosion with a horizontal 1 x `length` element, done on row runs:
+    every run of consecutive set pixels in a row is shrunk by length // 2 on
+    the left and (length - 1) // 2 on the right. O(nnz), no shifted copies.
+
+    Returns:
+        A new sparse object of the same type; surviving pixels keep their values.
+    """
+    if length < 1:
+        raise ValueError("Length must be a positive integer.")
+    keys, values = nonzero_entries(sparse_obj)
+    rows, cols = np.divmod(keys, sparse_obj.shape[1])
+    left, right = length // 2, (length - 1) // 2
+    # A run breaks wherever the next stored pixel is not the right-hand neighbour in the same row
+    breaks = np.r_[True, (np.diff(keys) != 1) | (rows[1:] != rows[:-1])] if len(keys) else np.array([], dtype=bool)
+    run_id = np.cumsum(breaks) - 1
+    run_starts = np.flatnonzero(breaks)
+    run_ends = np.r_[run_starts[1:], len(keys)] - 1
+    position = np.arange(len(keys))
+    keep = (position - run_starts[run_id] >= left) & (run_ends[run_id] - position >= right)
+    # The image border is background, so runs touching it lose pixels there too
+    keep &= (cols >= left) & (cols < sparse_obj.shape[1] - right)
+    return like_from_entries(sparse_obj, keys[keep], values[keep])
+
+def opening(sparse_obj, selem=None, binary=False):
+    """Erosion followed by dilation: removes speckles smaller than the element."""
+    return dilate(erode(sparse_obj, selem, binary), selem, binary)
+
+def closing(sparse_obj, selem=None, binary=False):
+    """Dilation followed by erosion: fills gaps and holes smaller than the element."""
+    return erode(dilate(sparse_obj, selem, binary), selem, binary)
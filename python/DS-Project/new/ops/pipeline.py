@@ -0,0 +1,103 @@
+import numpy as np
+from core.sparse_formats import COO
+from core.ds_utils import convert, convert_like
+from ops.crop import crop
+
+class TransformPipeline:
+    """
+    Lazily records rotate/flip/transpose/crop steps and applies them in one pass.
+
+    Every step is an integer affine map of pixel coordinates p = (row, col),
+    p -> A @ p + b, with A a signed permutation matrix. The steps are folded
+    into a single (A, b) and an output shape; on execute() the source region
+    that survives all crops is cut out once and its index arrays are remapped
+    in a single vectorized pass. The result matches applying the ops one by one.
+
+    Example:
+        TransformPipeline().rotate90().flip('horizontal').crop((0, 0, 64, 32)).execute(csr)
+    """
+    def __init__(self):
+        self.steps = []
+
+    def _add(self, name, *args):
+        self.steps.append((name, args))
+        return self
+
+    def rotate90(self):
+        return self._add('rotate90')
+
+    def rotate180(self):
+        return self._add('rotate180')
+
+    def rotate270(self):
+        return self._add('rotate270')
+
+    def transpose(self):
+        return self._add('transpose')
+
+    def flip(self, direction='vertical'):
+        if direction not in ('vertical', 'horizontal'):
+            raise ValueError("Direction must be 'vertical' or 'horizontal'")
+        return self._add('flip', direction)
+
+    def crop(self, box):
+        return self._add('crop', tuple(box))
+
+    @staticmethod
+    def _step_map(name, args, shape):
+        """Returns (A, b, new_shape) for one step applied to an image of `shape`."""
+        h, w = shape
+        if name == 'rotate90':
+            return np.array([[0, 1], [-1, 0]]), np.array([0, h - 1]), (w, h)
+        if name == 'rotate180':
+            return np.array([[-1, 0], [0, -1]]), np.array([h - 1, w - 1]), (h, w)
+        if name == 'rotate270':
+            return np.array([[0, -1], [1, 0]]), np.array([w - 1, 0]), (w, h)
+        if name == 'transpose':
+            return np.array([[0, 1], [1, 0]]), np.array([0, 0]), (w, h)
+        if name == 'flip':
+            if args[0] == 'vertical':
+                return np.array([[-1, 0], [0, 1]]), np.array([h - 1, 0]), (h, w)
+            return np.array([[1, 0], [0, -1]]), np.array([0, w - 1]), (h, w)
+        if name == 'crop':
+            x1, y1, x2, y2 = args[0]
+            if not (0 <= x1 < x2 <= w and 0 <= y1 < y2 <= h):
+                raise ValueError("Invalid crop box dimensions.")
+            return np.eye(2, dtype=np.int64), np.array([-y1, -x1]), (y2 - y1, x2 - x1)
+        raise ValueError(f"Unknown transform '{name}'.")
+
+    def fold(self, shape):
+        """
+        Composes the recorded steps for an input of `shape`.
+
+        Returns:
+            tuple: (A, b, output shape) such that output (row, col) = A @ (row, col) + b.
+        """
+        matrix, offset = np.eye(2, dtype=np.int64), np.zeros(2, dtype=np.int64)
+        for name, args in self.steps:
+            step_matrix, step_offset, shape = self._step_map(name, args, shape)
+            matrix, offset = step_matrix @ matrix, step_matrix @ offset + step_offset
+        return matrix, offset, tuple(int(n) for n in shape)
+
+    def source_box(self, shape):
+        """The (x1, y1, x2, y2) box of the input that survives every crop."""
+        matrix, offset, out_shape = self.fold(shape)
+        # A is a signed permutation, so its inverse is its transpose
+        corners = np.array([[0, 0], [out_shape[0] - 1, out_shape[1] - 1]])
+        src = (corners - offset) @ matrix
+        (r1, c1), (r2, c2) = src.min(axis=0), src.max(axis=0)
+        return int(c1), int(r1), int(c2) + 1, int(r2) + 1
+
+    def execute(self, sparse_obj):
+        """Applies all recorded steps to `sparse_obj` and returns a result in the same format."""
+        matrix, offset, out_shape = self.fold(sparse_obj.shape)
+        x1, y1, x2, y2 = self.source_box(sparse_obj.shape)
+        region = sparse_obj
+        if (x1, y1, x2, y2) != (0, 0, sparse_obj.shape[1], sparse_obj.shape[0]):
+            region = crop(sparse_obj, (x1, y1, x2, y2))
+            offset = offset + matrix @ np.array([y1, x1])
+        coo = convert(region, COO)
+        coords = np.stack([coo.row.astype(np.int64), coo.col.astype(np.int64)])
+        new_rows, new_cols = matrix @ coords + offset[:, None]
+        result = COO.from_arrays(new_rows, new_cols, coo.data, out_shape, dtype=coo.dtype)
+        return convert_like(result, sparse_obj)
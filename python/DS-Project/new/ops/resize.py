@@ -0,0 +1,91 @@
+import numpy as np
+from core.sparse_formats import COO
+from core.ds_utils import convert, convert_like
+
+def _factors(factor):
+    """Normalizes an int or (row, col) factor to a pair of positive ints."""
+    fy, fx = (factor, factor) if np.isscalar(factor) else factor
+    if fy < 1 or fx < 1:
+        raise ValueError("Scale factors must be positive integers.")
+    return int(fy), int(fx)
+
+def downsample(sparse_obj, factor=2, method='mean'):
+    """
+    Shrinks a sparse image by an integer factor without densifying it.
+    Non-zeros are binned by their reduced coordinates and aggregated per bin.
+
+    Args:
+        sparse_obj: The sparse object to shrink.
+        factor (int or tuple): Reduction factor, or (row factor, col factor).
+        method (str): 'nearest' keeps the top-left pixel of every block,
+            'mean' averages each block (background counts as 0),
+            'max' keeps the largest value of each block (max-pooling).
+
+    Returns:
+        A new sparse object of the same type with shape ceil(H / fy) x ceil(W / fx).
+    """
+    fy, fx = _factors(factor)
+    h, w = sparse_obj.shape
+    new_shape = (-(-h // fy), -(-w // fx))
+    coo = convert(sparse_obj, COO)
+    rows, cols = coo.row.astype(np.int64), coo.col.astype(np.int64)
+    data = np.asarray(coo.data)
+
+    if method == 'nearest':
+        keep = (rows % fy == 0) & (cols % fx == 0)
+        result = COO.from_arrays(rows[keep] // fy, cols[keep] // fx, data[keep], new_shape, dtype=coo.dtype)
+        return convert_like(result, sparse_obj)
+    if method not in ('mean', 'max'):
+        raise ValueError("Method must be 'nearest', 'mean' or 'max'")
+
+    # Group the non-zeros by the block they fall into
+    block_keys = (rows // fy) * new_shape[1] + cols // fx
+    blocks, block_of = np.unique(block_keys, return_inverse=True)
+    block_rows, block_cols = np.divmod(blocks, new_shape[1])
+    # Blocks on the bottom/right edge may be cut short by the image border
+    area = np.minimum(fy, h - block_rows * fy) * np.minimum(fx, w - block_cols * fx)
+
+    if method == 'mean':
+        sums = np.bincount(block_of, weights=data.astype(np.float64), minlength=len(blocks))
+        values = sums / area
+        if np.issubdtype(coo.dtype, np.integer):
+            values = np.rint(values)
+    else:
+        order = np.argsort(block_of, kind='stable')
+        starts = np.searchsorted(block_of[order], np.arange(len(blocks)))
+        values = np.maximum.reduceat(data[order], starts) if len(blocks) else data[:0]
+        # Partially filled blocks also contain background zeros
+        partial = np.bincount(block_of, minlength=len(blocks)) < area
+        values = np.where(partial, np.maximum(values, 0), values)
+
+    values = values.astype(coo.dtype)
+    nonzero = values != 0
+    result = COO.from_arrays(block_rows[nonzero], block_cols[nonzero], values[nonzero], new_shape, dtype=coo.dtype)
+    return convert_like(result, sparse_obj)
+
+def upsample(sparse_obj, factor=2):
+    """
+    Enlarges a sparse image by an integer factor (nearest neighbour):
+    every non-zero becomes a fy x fx block.
+
+    Returns:
+        A new sparse object of the same type with shape (H * fy, W * fx).
+    """
+    fy, fx = _factors(factor)
+    coo = convert(sparse_obj, COO)
+    dy, dx = np.divmod(np.arange(fy * fx), fx)
+    rows = (coo.row.astype(np.int64)[:, None] * fy + dy).ravel()
+    cols = (coo.col.astype(np.int64)[:, None] * fx + dx).ravel()
+    data = np.repeat(np.asarray(coo.data), fy * fx)
+    new_shape = (sparse_obj.shape[0] * fy, sparse_obj.shape[1] * fx)
+    return convert_like(COO.from_arrays(rows, cols, data, new_shape, dtype=coo.dtype), sparse_obj)
+
+def thumbnail(sparse_obj, max_size=256, method='mean'):
+    """
+    Downsamples a sparse image so its longest side is at most `max_size` pixels.
+    Returns the object unchanged if it is already small enough.
+    """
+    factor = -(-max(sparse_obj.shape) // max_size)
+    if factor <= 1:
+        return sparse_obj
+    return downsample(sparse_obj, factor, method)
@@ -1,25 +1,94 @@
-from core.sparse_formats import DOK
-from core.ds_utils import csr_to_dok, dok_to_csr, coo_to_csr, dok_to_coo
+import numpy as np
+from core.sparse_formats import COO, CSR
+from core.ds_utils import convert, convert_like, _csr_from_sorted, _csr_rows
+
+# Every op is a coordinate remap applied straight to the index arrays.
+# CSR inputs get dedicated O(nnz) paths that keep the row-major order; COO is
+# remapped in place order; any other format goes through COO and back.
+
+def _remap_coo(coo, new_rows, new_cols, new_shape):
+    return COO.from_arrays(new_rows, new_cols, coo.data, new_shape, dtype=coo.dtype)
+
+def _remap(sparse_obj, coo_remap, csr_remap):
+    """Dispatches a remap to the CSR fast path, the COO path, or a COO round-trip."""
+    if isinstance(sparse_obj, CSR):
+        return csr_remap(sparse_obj)
+    if isinstance(sparse_obj, COO):
+        return coo_remap(sparse_obj)
+    return convert_like(coo_remap(convert(sparse_obj, COO)), sparse_obj)
+
+def _transpose_csr(csr, new_rows, new_cols, new_shape, order):
+    """
+    Builds the CSR of a 90-degree style remap. `order` walks the stored elements
+    so that new_cols comes out ascending within every new row after a stable sort on new_rows.
+    """
+    new_rows, new_cols, data = new_rows[order], new_cols[order], csr.data[order]
+    by_row = np.argsort(new_rows, kind='stable')
+    return _csr_from_sorted(new_shape, csr.dtype, new_rows[by_row], new_cols[by_row], data[by_row])
 
 def rotate90(sparse_obj):
-    """Rotates a sparse object 90 degrees clockwise."""
-    
-    # For simplicity, we convert to DOK for manipulation
-    if sparse_obj.__class__.__name__ != 'DOK':
-        dok = csr_to_dok(sparse_obj) # Assuming CSR for now
-    else:
-        dok = sparse_obj
-
-    new_shape = (dok.shape[1], dok.shape[0])
-    new_dok = DOK(new_shape, dok.dtype)
-    
-    for (r, c), value in dok.pixels.items():
-        new_dok.set_pixel(c, dok.shape[0] - 1 - r, value)
-        
-    # Convert back to original format
-    if sparse_obj.__class__.__name__ == 'CSR':
-        return dok_to_csr(new_dok)
-    elif sparse_obj.__class__.__name__ == 'COO':
-        return dok_to_coo(new_dok)
-    
-    return new_dok
+    """Rotates a sparse object 90 degrees clockwise: (r, c) -> (c, H-1-r)."""
+    h, w = sparse_obj.shape
+    new_shape = (w, h)
+
+    def coo_remap(coo):
+        rows, cols = coo.row.astype(np.int64), coo.col.astype(np.int64)
+        return _remap_coo(coo, cols, h - 1 - rows, new_shape)
+
+    def csr_remap(csr):
+        rows = _csr_rows(csr)
+        # Walking the elements backwards makes the new columns (h-1-r) ascend
+        order = np.arange(len(csr.data))[::-1]
+        return _transpose_csr(csr, csr.indices.astype(np.int64), h - 1 - rows, new_shape, order)
+
+    return _remap(sparse_obj, coo_remap, csr_remap)
+
+def rotate180(sparse_obj):
+    """Rotates a sparse object 180 degrees: (r, c) -> (H-1-r, W-1-c)."""
+    h, w = sparse_obj.shape
+
+    def coo_remap(coo):
+        rows, cols = coo.row.astype(np.int64), coo.col.astype(np.int64)
+        return _remap_coo(coo, h - 1 - rows, w - 1 - cols, sparse_obj.shape)
+
+    def csr_remap(csr):
+        # Reversing the whole element order reverses the rows and the columns within each row
+        new_csr = CSR(csr.shape, dtype=csr.dtype)
+        new_csr.indptr = (len(csr.data) - csr.indptr[::-1]).astype(np.int32)
+        new_csr.indices = (w - 1 - csr.indices[::-1]).astype(np.int32)
+        new_csr.data = csr.data[::-1].copy()
+        new_csr.nnz = len(new_csr.data)
+        return new_csr
+
+    return _remap(sparse_obj, coo_remap, csr_remap)
+
+def rotate270(sparse_obj):
+    """Rotates a sparse object 90 degrees counter-clockwise: (r, c) -> (W-1-c, r)."""
+    h, w = sparse_obj.shape
+    new_shape = (w, h)
+
+    def coo_remap(coo):
+        rows, cols = coo.row.astype(np.int64), coo.col.astype(np.int64)
+        return _remap_coo(coo, w - 1 - cols, rows, new_shape)
+
+    def csr_remap(csr):
+        rows = _csr_rows(csr)
+        order = np.arange(len(csr.data))
+        return _transpose_csr(csr, w - 1 - csr.indices.astype(np.int64), rows, new_shape, order)
+
+    return _remap(sparse_obj, coo_remap, csr_remap)
+
+def transpose(sparse_obj):
+    """Transposes a sparse object: (r, c) -> (c, r)."""
+    h, w = sparse_obj.shape
+    new_shape = (w, h)
+
+    def coo_remap(coo):
+        return _remap_coo(coo, coo.col, coo.row, new_shape)
+
+    def csr_remap(csr):
+        rows = _csr_rows(csr)
+        order = np.arange(len(csr.data))
+        return _transpose_csr(csr, csr.indices.astype(np.int64), rows, new_shape, order)
+
+    return _remap(sparse_obj, coo_remap, csr_remap)
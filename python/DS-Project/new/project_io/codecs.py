@@ -0,0 +1,80 @@
+import bz2
+import lzma
+import time
+import zlib
+import numpy as np
+
+# Per-array byte codecs for compressed_io. Every codec maps bytes to bytes and
+# takes an optional level; None means the codec's own default.
+
+CODECS = {
+    'raw': (lambda buf, level: buf, lambda buf: buf),
+    'zlib': (lambda buf, level: zlib.compress(buf, 6 if level is None else level), zlib.decompress),
+    'bz2': (lambda buf, level: bz2.compress(buf, 9 if level is None else level), bz2.decompress),
+    'lzma': (lambda buf, level: lzma.compress(buf, preset=6 if level is None else level), lzma.decompress),
+}
+
+# Candidates tried by 'auto', from fastest to slowest
+AUTO_CANDIDATES = [('raw', None), ('zlib', 1), ('zlib', 6), ('zlib', 9), ('bz2', 9), ('lzma', 6)]
+AUTO_SAMPLE_BYTES = 1 << 16
+# 'auto' takes the fastest candidate whose sample is at most this much larger than the smallest one
+AUTO_SIZE_TOLERANCE = 0.05
+
+def _sample(buf, sample_bytes):
+    """Up to `sample_bytes` taken as four evenly spaced chunks, so sorted streams are sampled across their range."""
+    if len(buf) <= sample_bytes:
+        return buf
+    chunk = sample_bytes // 4
+    starts = np.linspace(0, len(buf) - chunk, 4).astype(np.int64)
+    return b''.join(buf[s:s + chunk] for s in starts)
+
+def choose_codec(array, sample_bytes=AUTO_SAMPLE_BYTES, tolerance=AUTO_SIZE_TOLERANCE):
+    """
+    Trial-compresses a sample of `array` with every AUTO_CANDIDATES entry.
+
+    Returns:
+        tuple: (codec name, level) of the fastest candidate within `tolerance` of the best size.
+    """
+    sample = _sample(np.ascontiguousarray(array).tobytes(), sample_bytes)
+    trials = []
+    for name, level in AUTO_CANDIDATES:
+        start_time = time.perf_counter()
+        size = len(CODECS[name][0](sample, level))
+        trials.append((name, level, size, time.perf_counter() - start_time))
+    best_size = min(size for _, _, size, _ in trials)
+    eligible = [t for t in trials if t[2] <= best_size * (1 + tolerance)]
+    name, level, _, _ = min(eligible, key=lambda t: t[3])
+    return name, level
+
+def encode_array(array, codec='zlib', level=None):
+    """
+    Encodes an array with a codec ('auto' picks one per array).
+
+    Returns:
+        tuple: (uint8 array of encoded bytes, spec dict with codec, level, dtype and shape).
+    """
+    array = np.ascontiguousarray(array)
+    if codec == 'auto':
+        codec, level = choose_codec(array)
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}'. Available: {', '.join(CODECS)}, auto.")
+    encoded = CODECS[codec][0](array.tobytes(), level)
+    spec = {'codec': codec, 'level': level, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+    return np.frombuffer(encoded, dtype=np.uint8), spec
+
+def decode_array(encoded, spec):
+    """Inverse of encode_array."""
+    decoded = CODECS[spec['codec']][1](np.asarray(encoded, dtype=np.uint8).tobytes())
+    return np.frombuffer(decoded, dtype=np.dtype(spec['dtype'])).reshape(spec['shape'])
+
+class DecodedArrays:
+    """Read-only mapping over stored blobs that decodes an array when it is first accessed."""
+    def __init__(self, loaded, specs):
+        self._loaded = loaded
+        self._specs = specs
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __getitem__(self, name):
+        return decode_array(self._loaded[name], self._specs[name])
@@ -1,90 +1,208 @@
 import numpy as np
 import json
-from core.sparse_formats import DOK, COO, CSR
-from core.ds_utils import dok_to_coo, coo_to_csr, csr_to_dok
-
-def save_sparse(filepath, sparse_objs):
-    """
-    Saves one or more sparse objects to a compressed .npz file.
-    """
-    if not isinstance(sparse_objs, list):
-        sparse_objs = [sparse_objs]
+from core.sparse_formats import DOK, HashDOK, COO, CSR, CSC, BSR
+from core.ds_utils import convert
+from alg.run_length_encode import RLE
+from project_io.codecs import encode_array, DecodedArrays
+from project_io.index_coding import encode_index_arrays, DecodedIndexArrays
 
+def sparse_metadata(sparse_objs):
+    """The metadata header shared by the on-disk containers."""
     first_obj = sparse_objs[0]
-    metadata = {
+    return {
         'format': first_obj.__class__.__name__,
         'shape': first_obj.shape,
         'dtype': np.dtype(first_obj.dtype).name,
-        'channels': len(sparse_objs)
+        'channels': len(sparse_objs),
+        # Older files use a single int 'nnz' for the whole file, so per-channel counts get their own key
+        'channel_nnz': [int(sparse_obj.nnz) for sparse_obj in sparse_objs]
     }
-    
-    data_dict = {'_metadata': np.array([json.dumps(metadata)])}
 
+def channel_arrays(sparse_obj, suffix):
+    """
+    Returns the native arrays stored for one channel, keyed by name + suffix.
+    DOK and HashDOK are stored as COO.
+    """
+    if isinstance(sparse_obj, (DOK, HashDOK)):
+        # Convert DOK to COO for efficient storage
+        sparse_obj = convert(sparse_obj, COO)
+
+    if isinstance(sparse_obj, (COO)):
+        return {f'row{suffix}': sparse_obj.row, f'col{suffix}': sparse_obj.col, f'data{suffix}': sparse_obj.data}
+    elif isinstance(sparse_obj, RLE):
+        return {f'indptr{suffix}': sparse_obj.indptr, f'indices{suffix}': sparse_obj.indices, f'lengths{suffix}': sparse_obj.lengths, f'data{suffix}': sparse_obj.data}
+    elif isinstance(sparse_obj, BSR):
+        return {f'indptr{suffix}': sparse_obj.indptr, f'indices{suffix}': sparse_obj.indices, f'blocks{suffix}': sparse_obj.blocks}
+    elif isinstance(sparse_obj, (CSR, CSC)):
+        return {f'indptr{suffix}': sparse_obj.indptr, f'indices{suffix}': sparse_obj.indices, f'data{suffix}': sparse_obj.data}
+    raise TypeError(f"Unsupported sparse format for saving: {type(sparse_obj)}")
+
+def channel_from_arrays(loaded, i, metadata):
+    """
+    Rebuilds channel `i` from a mapping of stored arrays (an open .npz or a dict of memmaps).
+    The arrays are used as they are, so memory-mapped inputs stay mapped.
+    """
     format_name = metadata['format']
-    
+    shape = tuple(metadata['shape'])
+    dtype = np.dtype(metadata['dtype'])
+    nnz = metadata['channel_nnz'][i] if 'channel_nnz' in metadata else None
+    suffix = f'_{i}'
+
+    # Reconstruct the native format that was saved (COO or CSR)
+    if f'blocks{suffix}' in loaded: # It's a BSR; the tile size is the trailing block dimension
+        blocks = loaded[f'blocks{suffix}']
+        bsr = BSR(shape, dtype, block_size=blocks.shape[1])
+        bsr.indptr = loaded[f'indptr{suffix}']
+        bsr.indices = loaded[f'indices{suffix}']
+        bsr.blocks = blocks
+        bsr.nnz = int(np.count_nonzero(blocks)) if nnz is None else nnz
+        native_obj = bsr
+    elif f'lengths{suffix}' in loaded: # It's an RLE; indices are the run start columns
+        rle = RLE(shape, dtype)
+        rle.indptr = loaded[f'indptr{suffix}']
+        rle.indices = loaded[f'indices{suffix}']
+        rle.lengths = loaded[f'lengths{suffix}']
+        rle.data = loaded[f'data{suffix}']
+        rle.nnz = int(rle.lengths.sum(dtype=np.int64)) if nnz is None else nnz
+        native_obj = rle
+    elif f'indptr{suffix}' in loaded: # It's a CSR, or a CSC if the metadata says so
+        compressed = CSC(shape, dtype) if format_name == 'CSC' else CSR(shape, dtype)
+        compressed.indptr = loaded[f'indptr{suffix}']
+        compressed.indices = loaded[f'indices{suffix}']
+        compressed.data = loaded[f'data{suffix}']
+        compressed.nnz = len(compressed.data)
+        native_obj = compressed
+    elif f'row{suffix}' in loaded: # It's a COO (or DOK saved as COO)
+        native_obj = COO.from_arrays(loaded[f'row{suffix}'], loaded[f'col{suffix}'], loaded[f'data{suffix}'], shape, dtype)
+    else:
+        raise ValueError(f"Could not find sparse data for channel {i} in file.")
+
+    # If the original format was stored as another one (DOK/HashDOK as COO), convert back
+    return convert(native_obj, format_name)
+
+def save_sparse(filepath, sparse_objs, codec='zlib', level=None, pack_indices=False):
+    """
+    Saves one or more sparse objects to a compressed .npz file.
+
+    Args:
+        filepath (str): Output path.
+        sparse_objs: A sparse object or a list of channels.
+        codec (str): 'zlib', 'bz2', 'lzma', 'raw', or 'auto' to pick the best
+            codec per array from a trial compression of a sample.
+        level (int): Codec level; None uses the codec's default.
+        pack_indices (bool): Delta-encode indptr/indices and pack them as bit fields or
+            varints before compression. Files get noticeably smaller but loads get
+            slower (see project_io.index_coding for numbers), so it is opt-in.
+    """
+    if not isinstance(sparse_objs, list):
+        sparse_objs = [sparse_objs]
+
+    metadata = sparse_metadata(sparse_objs)
+    metadata['codec'] = codec
+    arrays = {}
     for i, sparse_obj in enumerate(sparse_objs):
-        suffix = f'_{i}'
-        if format_name == 'DOK':
-            # Convert DOK to COO for efficient storage
-            sparse_obj = dok_to_coo(sparse_obj)
-        
-        if isinstance(sparse_obj, (COO)):
-            data_dict.update({f'row{suffix}': sparse_obj.row, f'col{suffix}': sparse_obj.col, f'data{suffix}': sparse_obj.data})
-        elif isinstance(sparse_obj, (CSR)):
-            data_dict.update({f'indptr{suffix}': sparse_obj.indptr, f'indices{suffix}': sparse_obj.indices, f'data{suffix}': sparse_obj.data})
-        else:
-            raise TypeError(f"Unsupported sparse format for saving: {type(sparse_obj)}")
-
-    np.savez_compressed(filepath, **data_dict)
+        arrays.update(channel_arrays(sparse_obj, f'_{i}'))
+    if pack_indices:
+        arrays, metadata['packed'] = encode_index_arrays(arrays)
+
+    if codec == 'zlib' and level is None:
+        # Default: the zip container's own deflate
+        np.savez_compressed(filepath, _metadata=np.array([json.dumps(metadata)]), **arrays)
+        return
+
+    # Every array is encoded on its own and stored uncompressed in the zip;
+    # the per-array codec, dtype and shape go into the metadata
+    metadata['level'] = level
+    metadata['arrays'] = {}
+    for name, array in arrays.items():
+        arrays[name], metadata['arrays'][name] = encode_array(array, codec, level)
+    np.savez(filepath, _metadata=np.array([json.dumps(metadata)]), **arrays)
+
+class SparseArchive:
+    """
+    Lazy handle on a .npz written by save_sparse.
+
+    Opening reads only the `_metadata` member, so shape/format/dtype/nnz/channels
+    are cheap; a channel's arrays are decompressed the first time it is indexed.
+    Loading never unpickles.
+
+    Example:
+        with SparseArchive('image.npz') as archive:
+            heatmap_source = archive[0]
+    """
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = np.load(filepath, allow_pickle=False)
+        self.metadata = json.loads(self._file['_metadata'][0])
+        # Files written with an explicit codec store encoded blobs described in the metadata
+        self._arrays = DecodedArrays(self._file, self.metadata['arrays']) if 'arrays' in self.metadata else self._file
+        if 'packed' in self.metadata:
+            self._arrays = DecodedIndexArrays(self._arrays, self.metadata['packed'])
+        self._channels = {}
+
+    @property
+    def format(self):
+        return self.metadata['format']
+
+    @property
+    def shape(self):
+        return tuple(self.metadata['shape'])
+
+    @property
+    def dtype(self):
+        return np.dtype(self.metadata['dtype'])
+
+    @property
+    def channels(self):
+        # Use .get() to provide backward compatibility with old files
+        return self.metadata.get('channels', 1)
+
+    @property
+    def codec(self):
+        # Files from before the codec layer used the npz deflate
+        return self.metadata.get('codec', 'zlib')
+
+    @property
+    def nnz(self):
+        """Total non-zeros over all channels; files without per-channel counts decode every channel."""
+        if 'channel_nnz' in self.metadata:
+            return sum(self.metadata['channel_nnz'])
+        if isinstance(self.metadata.get('nnz'), int):
+            return self.metadata['nnz']
+        return sum(channel.nnz for channel in self)
+
+    def __len__(self):
+        return self.channels
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.channels
+        if not 0 <= i < self.channels:
+            raise IndexError(f"Channel {i} out of range for {self.channels} channel(s).")
+        if i not in self._channels:
+            self._channels[i] = channel_from_arrays(self._arrays, i, self.metadata)
+        return self._channels[i]
+
+    def __iter__(self):
+        return (self[i] for i in range(self.channels))
+
+    def load(self):
+        """Decodes and returns all channels as a list."""
+        return list(self)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
 def load_sparse(filepath):
     """
     Loads one or more sparse objects from a .npz file.
     Returns a list of sparse objects.
     """
-    with np.load(filepath, allow_pickle=True) as loaded:
-        metadata = json.loads(loaded['_metadata'][0])
-        
-        format_name = metadata['format']
-        shape = tuple(metadata['shape'])
-        dtype = np.dtype(metadata['dtype'])
-        # Use .get() to provide backward compatibility with old files
-        channels = metadata.get('channels', 1)
-        
-        loaded_objs = []
-
-        for i in range(channels):
-            suffix = f'_{i}'
-            
-            # Reconstruct the native format that was saved (COO or CSR)
-            if f'indptr{suffix}' in loaded: # It's a CSR
-                csr = CSR(shape, dtype)
-                csr.indptr = loaded[f'indptr{suffix}']
-                csr.indices = loaded[f'indices{suffix}']
-                csr.data = loaded[f'data{suffix}']
-                csr.nnz = len(csr.data)
-                native_obj = csr
-            elif f'row{suffix}' in loaded: # It's a COO (or DOK saved as COO)
-                coo = COO(shape, dtype)
-                coo.row = loaded[f'row{suffix}']
-                coo.col = loaded[f'col{suffix}']
-                coo.data = loaded[f'data{suffix}']
-                coo.nnz = len(coo.data)
-                native_obj = coo
-            else:
-                raise ValueError(f"Could not find sparse data for channel {i} in file.")
-
-            # If the original format was DOK, convert back
-            # This part needs a robust coo_to_dok function.
-            if format_name == 'DOK':
-                if isinstance(native_obj, CSR):
-                     loaded_objs.append(csr_to_dok(native_obj))
-                else: # It's COO
-                    dok = DOK(shape, dtype)
-                    for r, c, v in zip(native_obj.row, native_obj.col, native_obj.data):
-                        dok.set_pixel(r, c, v)
-                    loaded_objs.append(dok)
-            else:
-                loaded_objs.append(native_obj)
-
-        return loaded_objs
+    with SparseArchive(filepath) as archive:
+        return archive.load()
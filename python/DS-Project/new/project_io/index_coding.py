@@ -0,0 +1,168 @@
+import numpy as np
+
+# Compact coding of the monotone index streams of CSR/CSC/BSR before they are
+# compressed. indptr is stored as row lengths and indices as per-row gaps,
+# which are small non-negative integers; these are then packed as fixed-width
+# bit fields, or as LEB128 varints when those are much smaller.
+#
+# Tradeoff: on 2000x2000 uint8 CSRs the packed files are 35-75% smaller under
+# zlib, but loading is 1.5-6x slower (e.g. 9.5 -> 14.7 ms for a 10% mask,
+# 37 -> 72 ms for a 40% grayscale image), because unpacking and the per-row
+# prefix sums cost more than inflating raw int32 indices. Use it for archives
+# and transfers where size matters more than load time.
+
+def varint_encode(values):
+    """LEB128-encodes non-negative integers: 7 bits per byte, high bit set on all but the last byte."""
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += (values >> np.uint64(7 * k)) != 0
+    starts = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for j in range(int(nbytes.max()) if len(values) else 0):
+        has = nbytes > j
+        byte = (values[has] >> np.uint64(7 * j)) & np.uint64(0x7F)
+        more = (nbytes[has] - 1 > j).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + j] = byte | more
+    return out
+
+def varint_decode(buf):
+    """Inverse of varint_encode. Returns uint64 values."""
+    buf = np.asarray(buf, dtype=np.uint8)
+    if not len(buf):
+        return np.array([], dtype=np.uint64)
+    last = buf < 0x80
+    value_starts = np.r_[0, np.flatnonzero(last)[:-1] + 1]
+    value_of = np.r_[0, np.cumsum(last)[:-1]]
+    position = np.arange(len(buf)) - value_starts[value_of]
+    parts = (buf & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    # The 7-bit groups do not overlap, so summing them is the same as or-ing them
+    return np.add.reduceat(parts, value_starts)
+
+def bitpack(values, width):
+    """Packs non-negative integers into `width`-bit little-endian fields."""
+    values = np.asarray(values, dtype=np.uint64)
+    if width == 0:
+        return np.array([], dtype=np.uint8)
+    bits = ((values[:, None] >> np.arange(width, dtype=np.uint64)) & np.uint64(1)).astype(np.uint8)
+    return np.packbits(bits.ravel(), bitorder='little')
+
+def bitunpack(buf, width, count):
+    """Inverse of bitpack. Returns uint64 values."""
+    if width == 0:
+        return np.zeros(count, dtype=np.uint64)
+    buf = np.asarray(buf, dtype=np.uint8)
+    if width <= 56:
+        # Every field lies within the `span` bytes starting at its first byte:
+        # gather them into one little-endian word per value, then shift and mask
+        span = (width + 7 + 7) // 8
+        bit_offsets = np.arange(count, dtype=np.int64) * width
+        byte_offsets = bit_offsets >> 3
+        padded = np.concatenate([buf, np.zeros(span, dtype=np.uint8)])
+        windows = padded[byte_offsets].astype(np.uint64)
+        for k in range(1, span):
+            windows |= padded[byte_offsets + k].astype(np.uint64) << np.uint64(8 * k)
+        return (windows >> (bit_offsets & 7).astype(np.uint64)) & np.uint64((1 << width) - 1)
+    bits = np.unpackbits(np.asarray(buf, dtype=np.uint8), count=count * width, bitorder='little').reshape(count, width)
+    return (bits.astype(np.uint64) << np.arange(width, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+# Varint decoding is several times slower than the bit-field gather, so it is
+# only used when it saves at least this fraction of the bit-packed size
+VARINT_MIN_SAVING = 0.25
+
+def pack(values):
+    """
+    Packs non-negative integers as fixed-width bit fields, or as varints when
+    that is at least VARINT_MIN_SAVING smaller (a few large gaps would otherwise
+    widen every field).
+
+    Returns:
+        tuple: (uint8 array, spec dict with packing, width and count).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    width = int(values.max()).bit_length() if len(values) else 0
+    bitpacked_size = -(-len(values) * width // 8)
+    varint = varint_encode(values)
+    if len(varint) <= bitpacked_size * (1 - VARINT_MIN_SAVING):
+        return varint, {'packing': 'varint', 'width': width, 'count': len(values)}
+    return bitpack(values, width), {'packing': 'bitpack', 'width': width, 'count': len(values)}
+
+def unpack(buf, spec):
+    """Inverse of pack."""
+    if spec['packing'] == 'varint':
+        return varint_decode(buf)
+    return bitunpack(buf, spec['width'], spec['count'])
+
+def delta_encode_indptr(indptr):
+    """indptr as row lengths."""
+    return np.diff(np.asarray(indptr, dtype=np.int64))
+
+def delta_decode_indptr(lengths):
+    return np.r_[0, np.cumsum(np.asarray(lengths, dtype=np.int64))]
+
+def delta_encode_indices(indptr, indices):
+    """Per-row gaps of sorted indices; the first index of each row is kept as is."""
+    indices = np.asarray(indices, dtype=np.int64)
+    gaps = np.empty_like(indices)
+    if len(indices):
+        gaps[0] = indices[0]
+        gaps[1:] = indices[1:] - indices[:-1]
+        row_starts = np.asarray(indptr[:-1], dtype=np.int64)
+        row_starts = row_starts[row_starts < len(indices)]
+        gaps[row_starts] = indices[row_starts]
+    return gaps
+
+def delta_decode_indices(indptr, gaps):
+    """Inverse of delta_encode_indices: cumulative sum restarted at every row."""
+    indptr = np.asarray(indptr, dtype=np.int64)
+    running = np.cumsum(np.asarray(gaps, dtype=np.int64))
+    before_row = np.r_[0, running][indptr[:-1]]
+    return running - np.repeat(before_row, np.diff(indptr))
+
+def encode_index_arrays(arrays):
+    """
+    Delta-encodes and packs every indptr/indices array in a channel array dict.
+
+    Returns:
+        tuple: (new array dict, spec dict for the packed names).
+    """
+    encoded, specs = dict(arrays), {}
+    for name, array in arrays.items():
+        if name.startswith('indptr'):
+            deltas = delta_encode_indptr(array)
+        elif name.startswith('indices'):
+            deltas = delta_encode_indices(arrays['indptr' + name[len('indices'):]], array)
+        else:
+            continue
+        encoded[name], specs[name] = pack(deltas)
+        specs[name]['dtype'] = np.asarray(array).dtype.str
+    return encoded, specs
+
+class DecodedIndexArrays:
+    """
+    Read-only mapping that unpacks and delta-decodes packed index arrays on access.
+    Decoded indptr arrays are cached, since every indices decode needs them.
+    """
+    def __init__(self, loaded, specs):
+        self._loaded = loaded
+        self._specs = specs
+        self._indptr_cache = {}
+
+    def __contains__(self, name):
+        return name in self._loaded
+
+    def __getitem__(self, name):
+        if name in self._indptr_cache:
+            return self._indptr_cache[name]
+        if name not in self._specs:
+            return self._loaded[name]
+        spec = self._specs[name]
+        deltas = unpack(self._loaded[name], spec).astype(np.int64)
+        if name.startswith('indptr'):
+            values = delta_decode_indptr(deltas)
+        else:
+            values = delta_decode_indices(self['indptr' + name[len('indices'):]], deltas)
+        values = values.astype(np.dtype(spec['dtype']))
+        if name.startswith('indptr'):
+            self._indptr_cache[name] = values
+        return values
@@ -0,0 +1,91 @@
+import numpy as np
+import json
+import struct
+from project_io.compressed_io import sparse_metadata, channel_arrays, channel_from_arrays
+
+# Uncompressed, memory-mappable container (.spm):
+#
+#   preamble   '<4sIQ': magic b'SPMM', format version, header length in bytes
+#   header     UTF-8 JSON: {'metadata': {...}, 'arrays': {name: {'dtype', 'shape', 'offset'}}}
+#   payload    raw little-endian arrays, each starting on an ALIGNMENT-byte boundary
+#
+# Offsets are relative to the payload start, which is the first aligned byte
+# after the header. Opening a file reads only the preamble and header and maps
+# the payload; pages are read on first access and shared between processes.
+
+MAGIC = b'SPMM'
+VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<4sIQ')
+
+def _aligned(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+def save_mapped(filepath, sparse_objs):
+    """
+    Saves one or more sparse objects to an uncompressed, memory-mappable file.
+    """
+    if not isinstance(sparse_objs, list):
+        sparse_objs = [sparse_objs]
+
+    arrays = {}
+    for i, sparse_obj in enumerate(sparse_objs):
+        arrays.update(channel_arrays(sparse_obj, f'_{i}'))
+
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array.astype(array.dtype.newbyteorder('<'), copy=False)
+        layout[name] = {'dtype': arrays[name].dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({'metadata': sparse_metadata(sparse_objs), 'arrays': layout}).encode('utf-8')
+    payload_start = _aligned(_PREAMBLE.size + len(header))
+    with open(filepath, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(payload_start + layout[name]['offset'])
+            f.write(array.tobytes())
+
+def read_header(filepath):
+    """
+    Reads the header of a mapped file without touching its payload.
+
+    Returns:
+        tuple: (metadata dict, array layout dict, payload start offset).
+    """
+    with open(filepath, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{filepath} is not a mapped sparse file.")
+        magic, version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a mapped sparse file.")
+        if version > VERSION:
+            raise ValueError(f"Unsupported mapped file version {version}.")
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    return header['metadata'], header['arrays'], _aligned(_PREAMBLE.size + header_len)
+
+def load_mapped(filepath, mode='r'):
+    """
+    Opens a file written by save_mapped. The arrays of the returned objects are
+    views into one memory map of the file, so opening is O(1) in the file size.
+    DOK and HashDOK channels are rebuilt in memory.
+
+    Args:
+        filepath (str): Path to the file.
+        mode (str): 'r' for read-only views, 'c' for copy-on-write.
+
+    Returns:
+        list: The sparse objects, one per channel.
+    """
+    metadata, layout, payload_start = read_header(filepath)
+    mapped = np.memmap(filepath, dtype=np.uint8, mode=mode)
+    arrays = {}
+    for name, entry in layout.items():
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        start = payload_start + entry['offset']
+        arrays[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(entry['shape'])
+    return [channel_from_arrays(arrays, i, metadata) for i in range(metadata['channels'])]
@@ -0,0 +1,31 @@
+import numpy as np
+import json
+from ops.diff import Patch
+
+def save_patch(filepath, patch):
+    """
+    Saves a Patch to a compressed .npz file. Only the touched pixels are stored.
+    """
+    metadata = {
+        'format': 'Patch',
+        'shape': patch.shape,
+        'dtype': patch.dtype.name,
+        'nnz': patch.nnz
+    }
+    # Linear indices fit in 32 bits for any image below 4 gigapixels
+    key_dtype = np.uint32 if patch.shape[0] * patch.shape[1] < 2 ** 32 else np.int64
+    np.savez_compressed(filepath,
+                        _metadata=np.array([json.dumps(metadata)]),
+                        keys=patch.keys.astype(key_dtype),
+                        values=patch.values,
+                        previous=patch.previous)
+
+def load_patch(filepath):
+    """
+    Loads a Patch saved by save_patch.
+    """
+    with np.load(filepath) as loaded:
+        metadata = json.loads(loaded['_metadata'][0])
+        if metadata.get('format') != 'Patch':
+            raise ValueError(f"{filepath} does not contain a patch.")
+        return Patch(metadata['shape'], metadata['dtype'], loaded['keys'], loaded['values'], loaded['previous'])
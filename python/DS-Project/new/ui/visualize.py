@@ -2,8 +2,9 @@ import matplotlib
 matplotlib.use('Agg')  # Use a non-interactive backend
 import matplotlib.pyplot as plt
 import numpy as np
+from ops.resize import thumbnail
 
-def create_sparsity_heatmap(sparse_obj, output_path, style='binary'):
+def create_sparsity_heatmap(sparse_obj, output_path, style='binary', max_size=512):
     """
     Creates a heatmap for the sparse matrix.
 
@@ -11,8 +12,11 @@ def create_sparsity_heatmap(sparse_obj, output_path, style='binary'):
         sparse_obj: A sparse format object (DOK, COO, or CSR).
         output_path (str): Path to save the heatmap image.
         style (str): 'binary' for black & white, 'value' for a color heatmap.
+        max_size (int): Longest side of the plotted image. Larger inputs are
+            max-pooled in sparse form first, so thin features stay visible and
+            the full-resolution image is never densified.
     """
-    dense_array = sparse_obj.to_dense()
+    dense_array = thumbnail(sparse_obj, max_size, method='max').to_dense()
 
     fig, ax = plt.subplots(figsize=(5, 5))
     
@@ -48,13 +48,11 @@ def process_compression(image_path, opts):
         gray_channel = np.dot(dense_array[...,:3], [0.2989, 0.5870, 0.1140]).astype(np.uint8)
         if opts['use_threshold']: gray_channel = thresholding.apply_threshold(gray_channel, opts['threshold_value'])
         channels = [gray_channel]
-    dok_channels = [ds_utils.dense_to_dok(c) for c in channels]
-    format_map = {'DOK': lambda d: d, 'COO': ds_utils.dok_to_coo, 'CSR': ds_utils.dok_to_csr}
-    sparse_channels = [format_map[opts['format'].upper()](d) for d in dok_channels]
+    format_map = {'DOK': ds_utils.dense_to_dok, 'COO': ds_utils.dense_to_coo, 'CSR': ds_utils.dense_to_csr, 'CSC': ds_utils.dense_to_csc}
+    sparse_channels = [format_map[opts['format'].upper()](c) for c in channels]
     compressed_io.save_sparse(paths['compressed_file'], sparse_channels)
     loaded_channels = compressed_io.load_sparse(paths['compressed_file'])
-    dense_recon_channels = [s.to_dense() for s in loaded_channels]
-    reconstructed_array = np.stack(dense_recon_channels, axis=-1) if len(dense_recon_channels) == 3 else dense_recon_channels[0]
+    reconstructed_array = ds_utils.channels_to_dense(loaded_channels)
     image_io.save_image(paths['reconstructed_image'], reconstructed_array)
     create_sparsity_heatmap(loaded_channels[0], paths['heatmap_image'], style='value' if opts['heatmap_style_value'] else 'binary')
     return {
@@ -92,19 +90,17 @@ def decompress():
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         try:
-            loaded_channels = compressed_io.load_sparse(filepath)
-            first_channel = loaded_channels[0]
-            dense_recon_channels = [s.to_dense() for s in loaded_channels]
-            is_color = len(dense_recon_channels) == 3
-            reconstructed_array = np.stack(dense_recon_channels, axis=-1) if is_color else dense_recon_channels[0]
-            ts = os.path.splitext(filename)[0]
-            reconstructed_filename = f"recon_{ts}.png"
-            heatmap_filename = f"heat_{ts}.png"
-            image_io.save_image(os.path.join(app.config['UPLOAD_FOLDER'], reconstructed_filename), reconstructed_array)
-            create_sparsity_heatmap(first_channel, os.path.join(app.config['UPLOAD_FOLDER'], heatmap_filename))
-            total_pixels = first_channel.shape[0] * first_channel.shape[1]
-            if is_color: total_pixels *=3
-            result = {'format': first_channel.__class__.__name__,'is_color': is_color,'compressed_size': os.path.getsize(filepath),'nnz': sum(s.nnz for s in loaded_channels),'total_pixels': total_pixels,'reconstructed_image': reconstructed_filename,'heatmap_image': heatmap_filename}
+            with compressed_io.SparseArchive(filepath) as archive:
+                # Stats come from the metadata; the heatmap only needs channel 0
+                is_color = archive.channels == 3
+                ts = os.path.splitext(filename)[0]
+                reconstructed_filename = f"recon_{ts}.png"
+                heatmap_filename = f"heat_{ts}.png"
+                create_sparsity_heatmap(archive[0], os.path.join(app.config['UPLOAD_FOLDER'], heatmap_filename))
+                reconstructed_array = ds_utils.channels_to_dense(archive.load())
+                image_io.save_image(os.path.join(app.config['UPLOAD_FOLDER'], reconstructed_filename), reconstructed_array)
+                total_pixels = archive.shape[0] * archive.shape[1] * archive.channels
+                result = {'format': archive.format,'is_color': is_color,'compressed_size': os.path.getsize(filepath),'nnz': archive.nnz,'total_pixels': total_pixels,'reconstructed_image': reconstructed_filename,'heatmap_image': heatmap_filename}
             return render_template('decompress.html', result=result)
         except Exception as e:
             app.logger.error(f"Decompression Error: {e}", exc_info=True)
@@ -130,15 +126,14 @@ def transform():
                     box = (x1, y1, x1 + w, y1 + h)
                     transformed_channels = [crop.crop(s, box) for s in loaded_channels]
                 else:
-                    transform_map = {'rotate90': rotate.rotate90, 'flip_vertical': lambda s: flip.flip(s, 'vertical'), 'flip_horizontal': lambda s: flip.flip(s, 'horizontal')}
+                    transform_map = {'rotate90': rotate.rotate90, 'rotate180': rotate.rotate180, 'rotate270': rotate.rotate270, 'transpose': rotate.transpose, 'flip_vertical': lambda s: flip.flip(s, 'vertical'), 'flip_horizontal': lambda s: flip.flip(s, 'horizontal')}
                     transformed_channels = [transform_map[transform_type](s) for s in loaded_channels]
                 
                 # Save and reconstruct "After" image
                 ts = os.path.splitext(filename)[0]
                 transformed_filename_npz = f"trans_{transform_type}_{ts}.npz"
                 compressed_io.save_sparse(os.path.join(app.config['UPLOAD_FOLDER'], transformed_filename_npz), transformed_channels)
-                dense_after = [s.to_dense() for s in transformed_channels]
-                after_array = np.stack(dense_after, axis=-1) if len(dense_after) == 3 else dense_after[0]
+                after_array = ds_utils.channels_to_dense(transformed_channels)
                 after_filename_img = f"after_{ts}.png"
                 image_io.save_image(os.path.join(app.config['UPLOAD_FOLDER'], after_filename_img), after_array)
 
@@ -163,8 +158,7 @@ def transform():
             try:
                 # Reconstruct image to display in the canvas
                 loaded_channels = compressed_io.load_sparse(filepath)
-                dense_recon_channels = [s.to_dense() for s in loaded_channels]
-                reconstructed_array = np.stack(dense_recon_channels, axis=-1) if len(dense_recon_channels) == 3 else dense_recon_channels[0]
+                reconstructed_array = ds_utils.channels_to_dense(loaded_channels)
                 
                 before_filename = f"before_{os.path.splitext(filename)[0]}.png"
                 image_io.save_image(os.path.join(app.config['UPLOAD_FOLDER'], before_filename), reconstructed_array)